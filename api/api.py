@@ -1,13 +1,32 @@
+import asyncio
+import base64
+import binascii
+import json
 import os
 import time
-from typing import Literal
+from typing import List, Literal
+
+import numpy as np
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException, Security
+from fastapi import Depends, FastAPI, HTTPException, Request, Security
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
 
+from config import (
+    executor_config,
+    search_batching_config,
+    search_cache_config,
+    tts_cache_config,
+)
+from src.services.audio_codec import AUDIO_MEDIA_TYPES, encode_audio, negotiate_format
+from src.services.bounded_executor import BoundedExecutor, ExecutorSaturated
+from src.services.embedding_batcher import EmbeddingBatcher
+from src.services.narration_cache import NarrationCache
 from src.services.piper_speaker import PIPER_VOICE_MAPPER, PiperSpeaker
 from src.services.qdrant_db import QdrantDB
+from src.services.search_cache import SearchCache
 
 
 load_dotenv()
@@ -29,6 +48,8 @@ app = FastAPI(
 )
 
 db = QdrantDB()
+db.batcher = EmbeddingBatcher(db.model, **search_batching_config)
+db.search_cache = SearchCache(**search_cache_config)
 
 # create class instances to load all models into memory
 speaker_models = {
@@ -36,6 +57,24 @@ speaker_models = {
     for key in PIPER_VOICE_MAPPER
 }
 
+# The same famous paintings are narrated over and over; identical requests are served
+# from here instead of being synthesized again.
+narration_cache = NarrationCache(**tts_cache_config)
+
+# CLIP and Piper work runs on separate, bounded pools: a burst of long narrations can
+# fill the TTS pool, but never the threads image search needs.
+search_pool = BoundedExecutor("search", **executor_config["search"])
+tts_pool = BoundedExecutor("synthesize", **executor_config["synthesize"])
+
+
+@app.exception_handler(ExecutorSaturated)
+def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> str:
     if credentials.credentials != API_TOKEN:
@@ -55,32 +94,205 @@ class ImageSearchRequest(BaseModel):
     image_data: str  # Base64 encoded image
 
 
-@app.post("/search")
-def search(request: ImageSearchRequest, token: str = Depends(verify_token)):
-    results = db.search(request.image_data)
+def decode_image_data(image_data: str) -> bytes:
+    """Decode a client's base64 image into bytes.
+
+    Strings are never handed to QdrantDB as they are: a short one would be opened as
+    a path on this server.
+    """
+    try:
+        return base64.b64decode(image_data, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=422, detail="image data is not valid base64")
+
+
+@app.post(
+    "/search",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+                "image/*": {"schema": {"type": "string", "format": "binary"}},
+                "application/json": {"schema": ImageSearchRequest.model_json_schema()},
+            },
+        }
+    },
+)
+async def search(http_request: Request, token: str = Depends(verify_token)):
+    """Search one image, sent as the raw request body.
+
+    The JSON body with a base64 `image_data` is still accepted for older clients, but
+    costs a third more bytes on the wire and a decode on arrival. The body is read by
+    hand to negotiate between the two, so its validation errors are raised as FastAPI's
+    own 422s here.
+    """
+    content_type = http_request.headers.get("content-type", "").split(";", 1)[0].strip()
+    if content_type == "application/json":
+        try:
+            image_data = ImageSearchRequest.model_validate(await http_request.json()).image_data
+        except json.JSONDecodeError as e:
+            raise RequestValidationError(
+                [{"type": "json_invalid", "loc": ("body", e.pos), "msg": e.msg, "input": {}}]
+            )
+        except ValidationError as e:
+            raise RequestValidationError(
+                [error | {"loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+        image_input = decode_image_data(image_data)
+    elif content_type == "application/octet-stream" or content_type.startswith("image/"):
+        image_input = await http_request.body()
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Send the image as application/octet-stream (or image/*), "
+            "or as JSON with a base64 image_data",
+        )
+    if not image_input:
+        raise HTTPException(status_code=422, detail="Empty image")
+
+    results = await search_pool.run(db.search, image_input)
     return results
 
 
+class ImageBatchSearchRequest(BaseModel):
+    images: List[str] = Field(min_length=1, max_length=64)  # Base64 encoded images
+
+
+@app.post("/search/batch")
+async def search_batch(request: ImageBatchSearchRequest, token: str = Depends(verify_token)):
+    """Search several images at once; results come back in the order of `images`."""
+    images = [decode_image_data(image_data) for image_data in request.images]
+    return await search_pool.run(db.search_batch, images)
+
+
+@app.get("/search/stats")
+def search_stats(token: str = Depends(verify_token)):
+    """Batcher, cache and pool counters: histograms and hit rates, for tuning."""
+    return {
+        "batcher": db.batcher.stats(),
+        "cache": db.search_cache.stats(),
+        "executor": search_pool.stats(),
+    }
+
+
 class SynthesizeRequest(BaseModel):
     text: str
     speaker: Literal['male', 'female']
     language: Literal['en', 'es', 'ca']
 
+    def cache_key(self) -> str:
+        speaker = speaker_models[(self.language, self.speaker)]
+        return NarrationCache.key(self.text, self.language, speaker.speaker, speaker.model)
+
 
 @app.post("/synthesize")
-def synthesize(request: SynthesizeRequest, token: str = Depends(verify_token)):
+async def synthesize(
+    request: SynthesizeRequest, http_request: Request, token: str = Depends(verify_token)
+):
+    """Synthesize the whole narration.
+
+    Clients that send `Accept: application/octet-stream` (raw int16 PCM), `audio/wav` or
+    `audio/ogg` get the audio as a binary body with its metadata in headers; anything else
+    gets the original JSON float list.
+    """
     start_time = time.time()
+    accept = http_request.headers.get("accept")
+    cache_key = request.cache_key()
+
+    # Hits never take a tts_pool slot: they must not be turned away with a 429, nor
+    # wait behind Piper syntheses, which are the only work the pool is sized for.
+    cached = await asyncio.to_thread(narration_cache.get, cache_key)
+    if cached:
+        return await asyncio.to_thread(
+            synthesis_response, request, accept, *cached, start_time, True
+        )
+    return await tts_pool.run(run_synthesis, request, accept, cache_key, start_time)
 
-    audio_array, sample_rate = speaker_models[(request.language, request.speaker)].synthesize(
-        request.text
-    )
 
+def run_synthesis(request: SynthesizeRequest, accept: str, cache_key: str, start_time: float):
+    audio_array, sample_rate = speaker_models[
+        (request.language, request.speaker)
+    ].synthesize(request.text)
+    narration_cache.put(cache_key, audio_array, sample_rate)
+    return synthesis_response(request, accept, audio_array, sample_rate, start_time, False)
+
+
+def synthesis_response(
+    request: SynthesizeRequest,
+    accept: str,
+    audio_array: np.ndarray,
+    sample_rate: int,
+    start_time: float,
+    cached: bool,
+):
     elapsed = time.time() - start_time
 
+    audio_format = negotiate_format(accept)
+    if audio_format:
+        return Response(
+            content=encode_audio(audio_array, sample_rate, audio_format),
+            media_type=AUDIO_MEDIA_TYPES[audio_format],
+            headers={
+                "X-Sample-Rate": str(sample_rate),
+                "X-Audio-Format": audio_format,
+                "X-Elapsed-Seconds": f"{elapsed:.3f}",
+                "X-Language": request.language,
+                "X-Speaker": request.speaker,
+                "X-Cache": "HIT" if cached else "MISS",
+            },
+        )
+
     return {
         "samples": audio_array.tolist(),
         "sr": sample_rate,
         "elapsed_seconds": elapsed,
         "language": request.language,
         "speaker": request.speaker,
+        "cached": cached,
     }
+
+
+@app.post("/synthesize/stream")
+async def synthesize_stream(request: SynthesizeRequest, token: str = Depends(verify_token)):
+    """Stream the narration sentence by sentence as newline-delimited JSON.
+
+    Each line carries one sentence of audio, written as soon as it is synthesized, so
+    the client can start playback after the first sentence instead of the whole text.
+    """
+    speaker = speaker_models[(request.language, request.speaker)]
+    cache_key = request.cache_key()
+
+    # As in /synthesize, a hit is answered without taking a tts_pool slot.
+    cached = await asyncio.to_thread(narration_cache.get, cache_key)
+    if cached:
+        line = await asyncio.to_thread(ndjson_chunk, 0, *cached)
+        return StreamingResponse(iter([line]), media_type="application/x-ndjson")
+
+    def generate_chunks():
+        chunks = []
+        for index, audio_array in enumerate(speaker.synthesize_stream(request.text)):
+            chunks.append(audio_array)
+            yield ndjson_chunk(index, audio_array, speaker.sample_rate)
+        # Only a narration streamed to the end is complete enough to be cached.
+        if chunks:
+            narration_cache.put(cache_key, np.concatenate(chunks), speaker.sample_rate)
+
+    # Admitted (or rejected with a 429) here, before the response starts.
+    chunks = tts_pool.stream(generate_chunks)
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+
+def ndjson_chunk(index: int, audio_array: np.ndarray, sample_rate: int) -> str:
+    return json.dumps({"index": index, "samples": audio_array.tolist(), "sr": sample_rate}) + "\n"
+
+
+@app.get("/synthesize/stats")
+def synthesize_stats(token: str = Depends(verify_token)):
+    return {"cache": narration_cache.stats(), "executor": tts_pool.stats()}
+
+
+@app.get("/synthesize/cache")
+def synthesize_cache_stats(token: str = Depends(verify_token)):
+    """Cache counters alone, as served before /synthesize/stats existed."""
+    return narration_cache.stats()
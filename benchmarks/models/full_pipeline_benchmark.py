@@ -1,4 +1,3 @@
-import base64
 import json
 import logging
 import os
@@ -104,10 +103,7 @@ def evaluate_pipeline(
     for i, item in enumerate(eval_set, 1):
         start = time.monotonic()
         try:
-            with open(item["image_path"], "rb") as f:
-                image_base64 = base64.b64encode(f.read()).decode("utf-8")
-
-            results = api_tools.search_painting(image_base64)
+            results = api_tools.search_painting(item["image_path"])
             clip_top1 = results[0] if results else None
             path = route(results, utils)
             path_counts[path] += 1
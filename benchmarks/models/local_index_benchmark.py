@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+from dotenv import load_dotenv
+
+from benchmarks.models.generate_dataset import load_eval_set
+from src.services.image_preprocessing import prepare_for_clip
+from src.services.local_index import LocalVectorIndex
+from src.services.qdrant_db import QdrantDB
+
+logging.getLogger("src.services.qdrant_db").setLevel(logging.ERROR)
+logging.getLogger("sentence_transformers").setLevel(logging.ERROR)
+logging.getLogger("httpx").setLevel(logging.ERROR)
+logging.getLogger("qdrant_client").setLevel(logging.ERROR)
+logging.basicConfig(level=logging.ERROR)
+
+CACHE_DIR = "benchmarks/models/bench_cache/famous"
+INDEX_DIR = "benchmarks/models/bench_cache/local_index"
+TOP_K = 5
+
+
+def _key(match: Dict) -> tuple:
+    return (match["title"], match["artist"], match["url"])
+
+
+def compare_backends(eval_set: List[Dict], db: QdrantDB, index: LocalVectorIndex) -> Dict:
+    """Query both backends with the same embedding and compare results and latency.
+
+    recall@5 is the share of Qdrant's top-5 that the local index also returns in its
+    top-5: Qdrant's HNSW search is itself approximate, so this measures agreement rather
+    than accuracy against ground truth.
+    """
+    qdrant_ms, local_ms, recalls, top1_agree = [], [], [], 0
+    for i, item in enumerate(eval_set, 1):
+        img = prepare_for_clip(item["image_path"])
+        embedding = db.model.encode(img)
+        img.close()
+
+        start = time.perf_counter()
+        hits = db.client.search(
+            collection_name=db.collection_name,
+            query_vector=db._query_vector(embedding),
+            limit=TOP_K,
+        )
+        qdrant_ms.append(1000 * (time.perf_counter() - start))
+        qdrant_top = [db._to_match(hit) for hit in hits]
+
+        start = time.perf_counter()
+        local_top = index.search(embedding, TOP_K)
+        local_ms.append(1000 * (time.perf_counter() - start))
+
+        shared = {_key(m) for m in qdrant_top} & {_key(m) for m in local_top}
+        recalls.append(len(shared) / max(len(qdrant_top), 1))
+        top1_agree += bool(qdrant_top and local_top and _key(qdrant_top[0]) == _key(local_top[0]))
+        print(
+            f"  [{i}/{len(eval_set)}] recall@{TOP_K}={recalls[-1]:.2f} "
+            f"qdrant={qdrant_ms[-1]:.1f}ms local={local_ms[-1]:.2f}ms"
+        )
+
+    def _latency(values: List[float]) -> Dict:
+        return {
+            "p50_ms": round(float(np.percentile(values, 50)), 2),
+            "p99_ms": round(float(np.percentile(values, 99)), 2),
+            "mean_ms": round(float(np.mean(values)), 2),
+        }
+
+    return {
+        "queries": len(eval_set),
+        "vectors": int(index.vectors.shape[0]),
+        f"recall_at_{TOP_K}": round(float(np.mean(recalls)), 4),
+        "top1_agreement": round(top1_agree / len(eval_set), 4),
+        "qdrant": _latency(qdrant_ms),
+        "local": _latency(local_ms),
+    }
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    db = QdrantDB()
+
+    results = {}
+    for dtype in ["float32", "float16"]:
+        index_dir = os.path.join(INDEX_DIR, dtype)
+        print(f"\nExporting collection to {index_dir} ({dtype})...")
+        LocalVectorIndex.export(db, index_dir, dtype=dtype)
+        index = LocalVectorIndex(index_dir)
+
+        eval_set = load_eval_set(CACHE_DIR)
+        print(f"Comparing backends on {len(eval_set)} images...")
+        results[dtype] = compare_backends(eval_set, db, index)
+
+    print("\n--- Results ---")
+    for dtype, summary in results.items():
+        print(f"  {dtype}: {summary}")
+
+    output_path = "benchmarks/models/benchmark_local_index.json"
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output_path}")
@@ -20,31 +20,40 @@ logging.basicConfig(level=logging.ERROR)
 CACHE_DIR_FAMOUS = "benchmarks/models/bench_cache/famous"
 CACHE_DIR_RANDOM = "benchmarks/models/bench_cache/random"
 
+SEARCH_BATCH_SIZE = 32
+
 
 def run_raw_searches(eval_set: List[Dict], db: QdrantDB) -> List[Dict]:
     """Run the CLIP/Qdrant search once per image and cache the raw top-1 outcome.
 
     Sweeping thresholds only changes the accept/reject decision on a fixed score, not
     the search itself, so the expensive part (embedding + vector search) is done once
-    per image and reused for every threshold in THRESHOLDS.
+    per image and reused for every threshold in THRESHOLDS. Images are searched
+    SEARCH_BATCH_SIZE at a time: one batched CLIP pass and one Qdrant request each.
     """
     raw = []
-    for i, item in enumerate(eval_set, 1):
-        with open(item["image_path"], "rb") as f:
-            image_b64 = base64.b64encode(f.read()).decode("utf-8")
+    for start in range(0, len(eval_set), SEARCH_BATCH_SIZE):
+        chunk = eval_set[start : start + SEARCH_BATCH_SIZE]  # noqa
+        images_b64 = []
+        for item in chunk:
+            with open(item["image_path"], "rb") as f:
+                images_b64.append(base64.b64encode(f.read()).decode("utf-8"))
 
         try:
-            results = db.search(image_b64)
+            batch_results = db.search_batch(images_b64)
         except Exception as exc:
-            print(f"  [{i}/{len(eval_set)}] search failed for {item['title']!r}: {exc}")
+            print(f"  [{start + 1}-{start + len(chunk)}/{len(eval_set)}] search failed: {exc}")
             continue
 
-        top1 = results[0] if results else {"title": None, "score": 0.0}
-        raw.append({"expected": item["title"], "top1_title": top1["title"], "score": top1["score"]})
-        print(
-            f"  [{i}/{len(eval_set)}] expected={item['title']!r} "
-            f"top1={top1['title']!r} score={top1['score']:.3f}"
-        )
+        for i, (item, results) in enumerate(zip(chunk, batch_results), start + 1):
+            top1 = results[0] if results else {"title": None, "score": 0.0}
+            raw.append(
+                {"expected": item["title"], "top1_title": top1["title"], "score": top1["score"]}
+            )
+            print(
+                f"  [{i}/{len(eval_set)}] expected={item['title']!r} "
+                f"top1={top1['title']!r} score={top1['score']:.3f}"
+            )
     return raw
 
 
@@ -1,6 +1,70 @@
-qdrant_config = {"collection": "paintings"}
+import os
+
+# Paths the dashboard and the ETLs share are anchored here: the dashboard runs from
+# dashboard_reflex/, so a bare relative path would land in a different directory.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# search_backend: "qdrant" queries the remote collection; "local" answers from the copy
+# exported to local_index_path by `python -m src.services.local_index`.
+qdrant_config = {
+    "collection": "paintings",
+    "search_backend": "qdrant",
+    "local_index_path": "tmp/local_index",
+}
+
+# Concurrent /search requests are coalesced into one CLIP forward pass of up to
+# max_batch_size images, waiting at most max_wait_ms for a batch to fill.
+search_batching_config = {"max_batch_size": 16, "max_wait_ms": 10}
+
+# Photos whose perceptual hashes differ by at most max_distance bits (of 64) reuse the
+# same search results, for up to ttl_seconds.
+search_cache_config = {"max_items": 2048, "max_distance": 6, "ttl_seconds": 6 * 3600}
+
+# Bounded worker pools behind the API's async handlers. Requests beyond
+# max_workers + max_pending are turned away with a 429. Search workers mostly wait on
+# the batcher, so there must be at least max_batch_size of them for batches to fill.
+executor_config = {
+    "search": {"max_workers": 16, "max_pending": 32},
+    "synthesize": {"max_workers": 2, "max_pending": 6, "retry_after": 5},
+}
+
+# speculative: start the blind vision calls of the LLM fallback alongside the CLIP
+# search, cancelling them when the search clears the score threshold. Trades wasted
+# vision calls on confident matches for a faster fallback path.
+agent_config = {"speculative": False}
+
+# Generated descriptions, reused across runs for the same title, language and length
+# until ttl_seconds pass or the description prompt changes.
+description_cache_config = {
+    "path": os.path.join(PROJECT_ROOT, "tmp/agent/descriptions.sqlite3"),
+    "ttl_seconds": 30 * 24 * 3600,
+}
+
+# Narrations pregenerated by NarrationETL for the top_n most viewed paintings in the
+# collection, in every language, duration and voice; served without an LLM or TTS call.
+narration_store_config = {"path": os.path.join(PROJECT_ROOT, "tmp/narrations"), "top_n": 500}
 
 api_config = {"url": "https://artguide-api.thebluetonguegiraffe.online/"}
 # api_config = {"url": "http://localhost:7005"}
 
 tts_config = {"path": "tts/models"}
+
+# Where ETL runs keep their manifests, checkpoints and metric reports between runs;
+# "prometheus" also writes each report in the Prometheus text format.
+etl_config = {"state_dir": "tmp/etl", "prometheus": False}
+
+# WikiArt crawling: connection pool, retries and the starting point of the per-host
+# adaptive rate limiter (requests per second).
+wikiart_config = {
+    "pool_size": 10,
+    "max_retries": 4,
+    "rate": 2.0,
+    "min_rate": 0.2,
+    "max_rate": 20.0,
+}
+
+tts_cache_config = {
+    "path": "tts/cache",
+    "max_memory_items": 128,
+    "max_disk_bytes": 512 * 1024 * 1024,
+}
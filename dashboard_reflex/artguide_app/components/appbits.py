@@ -225,7 +225,7 @@ def audio_player(large: bool = False) -> rx.Component:
     ]
 
     return rx.box(
-        rx.el.audio(src=State.audio_src, preload="metadata"),
+        rx.el.audio(preload="metadata"),
         rx.hstack(
             rx.center(
                 rx.box(
@@ -131,7 +131,7 @@ def _narration(large: bool = False) -> rx.Component:
             State.audio_error,
             _inline_error(State.t["audio_error"]),
             rx.cond(
-                State.audio_src != "",
+                State.audio_ready,
                 rx.box(audio_player(large=large), class_name="ag-enter-down", width="100%"),
             ),
         ),
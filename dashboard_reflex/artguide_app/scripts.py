@@ -132,6 +132,14 @@ def click_file_input_script(upload_id: str) -> str:
 # than global ids, since a hidden duplicate instance always exists on the
 # other breakpoint (mobile vs desktop) and a global getElementById would
 # silently grab the wrong — possibly invisible — one.
+#
+# The narration arrives a sentence at a time (see `queue_segment_script`), so
+# the <audio> src is managed here rather than bound to state: each element
+# walks the segment queue on `ended` and waits if synthesis has fallen behind.
+# Once the narration is complete (`narration_done_script`) the last `ended`
+# rewinds to the first sentence, so a replay walks the same segments again
+# instead of the whole narration being sent a second time. Only a run that
+# streamed no segments hands over one full file.
 AUDIO_PLAYER = """
 (function () {
   if (window.__agAudioInit) return;
@@ -143,6 +151,66 @@ AUDIO_PLAYER = """
     return m + ':' + String(s).padStart(2, '0');
   };
 
+  const narration = { segments: [], full: '', done: false };
+  const players = () => document.querySelectorAll('.ag-player audio');
+
+  // Point an idle <audio> at whatever it should hold next; `play` keeps a
+  // listener who ran ahead of synthesis going once the next sentence lands.
+  const advance = (a, play) => {
+    delete a.dataset.waiting;
+    const next = a.dataset.seg === undefined ? 0 : Number(a.dataset.seg) + 1;
+    if (next < narration.segments.length) {
+      a.dataset.seg = String(next);
+      a.src = narration.segments[next];
+      if (play) a.play();
+    } else if (narration.full) {
+      delete a.dataset.seg;
+      a.dataset.full = '1';
+      a.src = narration.full;
+    } else if (narration.done && narration.segments.length) {
+      a.dataset.seg = '0';
+      a.src = narration.segments[0];
+    } else if (play) {
+      a.dataset.waiting = '1';
+    }
+  };
+
+  window.agResetNarration = () => {
+    narration.segments = [];
+    narration.full = '';
+    narration.done = false;
+    players().forEach((a) => {
+      a.pause();
+      a.removeAttribute('src');
+      delete a.dataset.seg;
+      delete a.dataset.full;
+      delete a.dataset.waiting;
+    });
+  };
+
+  window.agQueueSegment = (uri) => {
+    narration.segments.push(uri);
+    players().forEach((a) => {
+      if (a.dataset.waiting === '1') advance(a, true);
+    });
+  };
+
+  window.agNarrationDone = (uri) => {
+    narration.full = uri || '';
+    narration.done = true;
+    players().forEach((a) => {
+      // Every sentence already heard: rewind for a replay.
+      if (a.dataset.waiting === '1') advance(a, false);
+    });
+  };
+
+  // `ended` does not bubble, so listen in the capture phase.
+  document.addEventListener('ended', (e) => {
+    const a = e.target;
+    if (!a.closest || !a.closest('.ag-player') || a.dataset.full) return;
+    advance(a, true);
+  }, true);
+
   document.addEventListener('click', (e) => {
     const btn = e.target.closest('.ag-play');
     if (!btn) return;
@@ -156,6 +224,8 @@ AUDIO_PLAYER = """
     document.querySelectorAll('.ag-player').forEach((root) => {
       const a = root.querySelector('audio');
       if (!a) return;
+      // The player mounts after the first segment was queued.
+      if (!a.getAttribute('src')) advance(a, false);
       const dur = a.duration || 0, cur = a.currentTime || 0;
 
       const time = root.querySelector('.ag-time');
@@ -184,6 +254,22 @@ AUDIO_PLAYER = """
 """
 
 
+# Drive the player's narration queue from the agent run (see AUDIO_PLAYER). The
+# URIs are base64 data URIs, so they are safe inside single quotes.
+RESET_NARRATION = "window.agResetNarration && window.agResetNarration()"
+
+
+def queue_segment_script(uri: str) -> str:
+    """Append one synthesized sentence to the narration being played."""
+    return f"window.agQueueSegment && window.agQueueSegment('{uri}')"
+
+
+def narration_done_script(uri: str = "") -> str:
+    """Mark the narration complete; `uri` is the whole narration, only for a run that
+    streamed no segments."""
+    return f"window.agNarrationDone && window.agNarrationDone('{uri}')"
+
+
 # Scroll-reveal: fade/slide sections in, draw label underlines, subtle parallax.
 # Re-scans on DOM mutations so it survives Reflex re-renders (e.g. language switch).
 REVEAL = """
@@ -11,7 +11,7 @@ from pathlib import Path
 
 import numpy as np
 import reflex as rx
-from PIL import Image, ImageOps
+from PIL import Image
 from scipy.io import wavfile
 
 # iPhones hand over HEIC, which Pillow cannot open on its own. Optional so a
@@ -23,6 +23,7 @@ try:
 except ImportError:
     pass
 
+from artguide_app import scripts
 from artguide_app.translations import TEXT_TRANSLATIONS as tt
 from artguide_app.landing_texts import LANDING, WAITING_PHRASES
 from artguide_app.contact import send_contact_email
@@ -41,6 +42,11 @@ except Exception:  # pragma: no cover - dotenv optional
 
 LANGUAGES = ["es", "ca", "en"]
 
+# Longest side of the photo handed to the agent. CLIP only looks at 224px and the
+# vision models downscale on their side, so a 12MP original is just slower to move.
+AGENT_MAX_SIDE = 2048
+PREVIEW_MAX_SIDE = 1280
+
 # The agent's tools log through `logging`, which reaches stderr and therefore the
 # container logs. Anything printed to stdout does not: it sits in Python's block
 # buffer until the process exits, so pipeline failures were invisible in practice.
@@ -69,8 +75,13 @@ _SHAPES = ["bracket_tl", "circle", "leaf", "dashed", "bracket_br"]
 
 
 def _samples_to_wav_data_uri(samples, sr: int) -> str:
-    """Convert float32 PCM samples returned by the API into a base64 wav data URI."""
-    arr = np.asarray(samples, dtype=np.float32)
+    """Convert the float32 samples (in [-1, 1]) returned by the API into a base64 wav
+    data URI.
+
+    They are written as 16-bit PCM, half the size of a float WAV: the URI travels to
+    the browser inside a websocket delta, and 16 bits is what the voice produced.
+    """
+    arr = (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767).astype(np.int16)
     byte_io = io.BytesIO()
     wavfile.write(byte_io, sr, arr)
     return f"data:audio/wav;base64,{base64.b64encode(byte_io.getvalue()).decode()}"
@@ -114,7 +125,10 @@ class State(rx.State):
     year: str = ""
     museum: str = ""
     description: str = ""
-    audio_src: str = ""
+    # The audio itself never goes through state: sentences are queued into the
+    # player as they are synthesized (see scripts.AUDIO_PLAYER); this only says
+    # the first one is there.
+    audio_ready: bool = False
     confidence: str = ""      # e.g. "98" (empty when the deep search answered)
     audio_generating: bool = False
     audio_error: bool = False
@@ -305,7 +319,7 @@ class State(rx.State):
         self.year = ""
         self.museum = ""
         self.description = ""
-        self.audio_src = ""
+        self.audio_ready = False
         self.confidence = ""
         self.audio_generating = False
         self.audio_error = False
@@ -392,20 +406,21 @@ class State(rx.State):
         preview want something ordinary, so everything is decoded and re-encoded
         here rather than each caller guessing at the format.
 
-        `exif_transpose` matters on phones specifically: cameras record the
-        orientation as EXIF metadata instead of rotating the pixels, so a photo
-        taken sideways reaches the agent sideways unless it is applied.
+        Decoding goes through the same preprocessing as the API: EXIF orientation
+        is applied (cameras record it as metadata instead of rotating the pixels),
+        and with `max_side` JPEGs are decoded directly at reduced scale rather than
+        at full resolution and then shrunk.
 
         Returns the original bytes untouched if Pillow cannot decode them --
         better to let the agent try than to fail outright here.
         """
+        from src.services.image_preprocessing import fit_within, load_image
+
         try:
-            img = Image.open(io.BytesIO(data))
-            img = ImageOps.exif_transpose(img)
             if max_side:
-                img.thumbnail((max_side, max_side))
-            if img.mode not in ("RGB", "L"):
-                img = img.convert("RGB")
+                img = fit_within(io.BytesIO(data), max_side)
+            else:
+                img = load_image(io.BytesIO(data))
             buf = io.BytesIO()
             img.save(buf, format="JPEG", quality=85)
             return buf.getvalue()
@@ -415,13 +430,13 @@ class State(rx.State):
     def _begin(self, data: bytes):
         """Shared setup for both entry points, then hand off to the agent."""
         self._clear()
-        # The temp file is what the agent reads, so it gets the full-size image;
+        # The temp file is what the agent reads, so it gets the larger image;
         # `shot` only has to fill a preview box, and it travels to the browser
         # base64-encoded inside a websocket delta, so it gets a small one.
-        full = State._to_jpeg(data)
+        full = State._to_jpeg(data, max_side=AGENT_MAX_SIDE)
         self.shot = (
             "data:image/jpeg;base64,"
-            + base64.b64encode(State._to_jpeg(data, max_side=1280)).decode()
+            + base64.b64encode(State._to_jpeg(data, max_side=PREVIEW_MAX_SIDE)).decode()
         )
         self.stage = "analyzing"
         self.camera_on = False
@@ -442,12 +457,15 @@ class State(rx.State):
             }
         if not tmp_path:
             return
+        yield rx.call_script(scripts.RESET_NARRATION)
 
         try:
-            from src.agent.artguide_agent import ArtGuide
+            from src.agent.artguide_agent import get_artguide
 
-            agent = ArtGuide(config=config)
-            gen = agent.run_streaming(tmp_path)
+            # Built once per process and shared across sessions; the first photo pays
+            # for it, off the event loop.
+            agent = await asyncio.to_thread(get_artguide)
+            gen = agent.run_streaming(tmp_path, config)
 
             def _next(g):
                 try:
@@ -461,6 +479,31 @@ class State(rx.State):
                     break
                 st = update["state"]
 
+                custom = update.get("custom") or {}
+                if custom.get("audio_segment"):
+                    # Each sentence is playable as soon as it is synthesized, long
+                    # before the rest of the narration is.
+                    segment = custom["audio_segment"]
+                    segment_uri = await asyncio.to_thread(
+                        _samples_to_wav_data_uri, segment["samples"], segment["sr"]
+                    )
+                    async with self:
+                        self.audio_ready = True
+                        self.audio_generating = False
+                        self.audio_error = False
+                    yield rx.call_script(scripts.queue_segment_script(segment_uri))
+                    continue
+
+                if custom.get("description"):
+                    # The description streams in while its first sentences are
+                    # already being narrated; show it as it is written.
+                    async with self:
+                        if self.title:
+                            self.description = str(custom["description"])
+                            self.description_error = False
+                            self.audio_generating = not self.audio_ready
+                    continue
+
                 if st.get("status") == "error":
                     async with self:
                         self.stage = "error"
@@ -468,11 +511,18 @@ class State(rx.State):
                     continue
 
                 if "sr" in st:
-                    audio_uri = _samples_to_wav_data_uri(st["samples"], st["sr"])
                     async with self:
-                        self.audio_src = audio_uri
+                        streamed = self.audio_ready
+                    # The player already holds every streamed sentence; the whole
+                    # narration is only encoded and sent when none were streamed.
+                    audio_uri = "" if streamed else await asyncio.to_thread(
+                        _samples_to_wav_data_uri, st["samples"], st["sr"]
+                    )
+                    async with self:
+                        self.audio_ready = True
                         self.audio_generating = False
                         self.audio_error = False
+                    yield rx.call_script(scripts.narration_done_script(audio_uri))
                 elif "top_result" in st and st["top_result"].get("title"):
                     # `top_result` grows richer at each step (identification, then
                     # description) — pick up whatever's newly present rather than
@@ -492,7 +542,7 @@ class State(rx.State):
                         if description:
                             self.description = str(description)
                             self.description_error = False
-                            self.audio_generating = True
+                            self.audio_generating = not self.audio_ready
 
         except Exception as exc:
             # exc_info so the traceback names the failing node, and the stage flags so
@@ -503,7 +553,10 @@ class State(rx.State):
                 exc_info=True,
             )
             async with self:
-                if self.description:
+                if self.audio_ready:
+                    # Part of the narration already reached the player; keep it.
+                    self.audio_generating = False
+                elif self.description:
                     # Identification and description both succeeded — only the
                     # audio synthesis step failed, so keep showing the text.
                     self.audio_error = True
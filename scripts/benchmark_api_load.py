@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import requests
+from dotenv import load_dotenv
+
+from config import api_config
+
+DURATION_SECONDS = 60
+SEARCH_CLIENTS = 8
+SYNTHESIZE_CLIENTS = 4
+
+IMAGE_PATH = "img/matrimoni_arnolfini.jpg"
+NARRATION = (
+    "The Arnolfini Portrait was painted by Jan van Eyck in 1434. It shows a merchant and "
+    "his wife in a room in Bruges, rendered with an almost impossible attention to detail. "
+    "The convex mirror on the back wall reflects two more figures entering the room."
+)
+
+
+class LoadClient(threading.Thread):
+    """Fires one kind of request back to back until the deadline, recording each outcome."""
+
+    def __init__(self, endpoint: str, body: dict, headers: dict, deadline: float):
+        super().__init__(daemon=True)
+        self.endpoint = endpoint
+        self.body = body  # keyword arguments for requests: `json=...` or `data=...`
+        self.headers = headers
+        self.deadline = deadline
+        self.latencies = []  # seconds, successful requests only
+        self.statuses = Counter()
+
+    def run(self):
+        session = requests.Session()
+        while time.perf_counter() < self.deadline:
+            start = time.perf_counter()
+            try:
+                response = session.post(
+                    f"{api_config['url'].rstrip('/')}{self.endpoint}",
+                    headers=self.headers,
+                    timeout=120,
+                    **self.body,
+                )
+            except requests.RequestException:
+                self.statuses["error"] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            self.statuses[response.status_code] += 1
+            if response.ok:
+                self.latencies.append(elapsed)
+            elif response.status_code == 429:
+                time.sleep(float(response.headers.get("Retry-After", 1)))
+
+
+def summarize(clients: list) -> dict:
+    latencies = np.array([t for c in clients for t in c.latencies])
+    statuses = sum((c.statuses for c in clients), Counter())
+    summary = {"requests": sum(statuses.values()), "statuses": dict(statuses)}
+    if len(latencies):
+        summary.update(
+            {
+                "p50_seconds": round(float(np.percentile(latencies, 50)), 3),
+                "p99_seconds": round(float(np.percentile(latencies, 99)), 3),
+                "max_seconds": round(float(latencies.max()), 3),
+                "throughput_per_second": round(len(latencies) / DURATION_SECONDS, 2),
+            }
+        )
+    return summary
+
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    headers = {"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
+    with open(IMAGE_PATH, "rb") as f:
+        search_body = {"data": f.read()}
+    # Distinct texts per client, otherwise the narration cache answers everything.
+    synth_bodies = [
+        {"json": {"text": f"{NARRATION} Visitor {i}.", "speaker": "female", "language": "en"}}
+        for i in range(SYNTHESIZE_CLIENTS)
+    ]
+
+    print(
+        f"Mixed load for {DURATION_SECONDS}s: "
+        f"{SEARCH_CLIENTS} search clients, {SYNTHESIZE_CLIENTS} synthesize clients"
+    )
+    deadline = time.perf_counter() + DURATION_SECONDS
+    search_clients = [
+        LoadClient("/search", search_body, headers | {"Content-Type": "application/octet-stream"},
+                   deadline)
+        for _ in range(SEARCH_CLIENTS)
+    ]
+    synth_clients = [
+        LoadClient("/synthesize", body, headers | {"Accept": "application/octet-stream"}, deadline)
+        for body in synth_bodies
+    ]
+    for client in search_clients + synth_clients:
+        client.start()
+    for client in search_clients + synth_clients:
+        client.join()
+
+    results = {"search": summarize(search_clients), "synthesize": summarize(synth_clients)}
+
+    print("\n--- Results ---")
+    for endpoint, summary in results.items():
+        print(f"  {endpoint}: {summary}")
+
+    output_path = "scripts/api_load_results.json"
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output_path}")
@@ -12,13 +12,31 @@ logging.basicConfig(level=logging.WARNING)
 SAMPLE_SIZE = 100
 BATCH_SIZE = 10
 WORKER_CONFIGS = [1, 2, 4, 8]
+# (transform_workers, load_workers) pipeline threads, swept at a fixed executor size
+STAGE_CONFIGS = [(1, 1), (2, 1), (2, 2), (4, 2), (4, 4)]
+STAGE_SWEEP_WORKERS = 4
 
 
 class BenchmarkWikiArtETL(WikiArtETL):
     """WikiArtETL with a dummy load() and a sample cap on extract()."""
 
-    def __init__(self, workers: int, sample_size: int, batch_size: int):
-        super().__init__(batch_size=batch_size, workers=workers)
+    # Keeps benchmark runs from overwriting the real crawl's checkpoint.
+    name = "wikiart_benchmark"
+
+    def __init__(
+        self,
+        workers: int,
+        sample_size: int,
+        batch_size: int,
+        transform_workers: int = 1,
+        load_workers: int = 1,
+    ):
+        super().__init__(
+            batch_size=batch_size,
+            workers=workers,
+            transform_workers=transform_workers,
+            load_workers=load_workers,
+        )
         self.sample_size = sample_size
         self._extracted = 0
 
@@ -33,7 +51,7 @@ class BenchmarkWikiArtETL(WikiArtETL):
             if self._extracted >= self.sample_size:
                 break
 
-    def load(self, batch):
+    def load(self, batch, embeddings=None):
         """Dummy load — no writes to Qdrant."""
         time.sleep(0.01)  # simulate minimal I/O
 
@@ -44,10 +62,11 @@ def run_sequential(workers: int, sample_size: int, batch_size: int) -> dict:
     total_processed = 0
 
     start = time.perf_counter()
-    for batch in etl.extract():
-        enriched = etl.transform(batch)
-        etl.load(enriched)
-        total_processed += len(batch)
+    with etl.transform_executor():
+        for batch in etl.extract():
+            enriched = etl.transform(batch)
+            etl.load(enriched)
+            total_processed += len(batch)
     elapsed = round(time.perf_counter() - start, 3)
     throughput = round(total_processed / elapsed, 2)
 
@@ -62,23 +81,51 @@ def run_sequential(workers: int, sample_size: int, batch_size: int) -> dict:
     }
 
 
-def run_threaded(workers: int, sample_size: int, batch_size: int) -> dict:
+def run_threaded(
+    workers: int,
+    sample_size: int,
+    batch_size: int,
+    transform_workers: int = 1,
+    load_workers: int = 1,
+) -> dict:
     """Full pipeline threading: Extract / Transform / Load in separate threads."""
-    etl = BenchmarkWikiArtETL(workers=workers, sample_size=sample_size, batch_size=batch_size)
-
-    start = time.perf_counter()
-    etl.run()  # uses BasePaintingsETL.run() with threading
-    elapsed = round(time.perf_counter() - start, 3)
+    etl = BenchmarkWikiArtETL(
+        workers=workers,
+        sample_size=sample_size,
+        batch_size=batch_size,
+        transform_workers=transform_workers,
+        load_workers=load_workers,
+    )
+
+    report = etl.run()  # uses BasePaintingsETL.run() with threading
+    elapsed = report["elapsed_seconds"]
+    # Per-stage figures from the run report; queue samples are summarised, not kept
+    stages = report["stages"]
+    queues = {
+        name: {k: v for k, v in summary.items() if k != "samples"}
+        for name, summary in report["queues"].items()
+    }
 
     throughput = round(sample_size / elapsed, 2)
-    label = f"threaded (workers={workers})"
-    print(f"  {label}: {elapsed}s — {throughput} artworks/s")
+    label = f"threaded (workers={workers}, transform={transform_workers}, load={load_workers})"
+    print(f"  {label}: {elapsed}s — {throughput} artworks/s, bottleneck: {report['bottleneck']}")
+    for stage, summary in stages.items():
+        print(
+            f"    {stage}: utilization={summary['utilization']} "
+            f"busy={summary['busy_seconds']}s wait={summary['wait_seconds']}s "
+            f"errors={summary['errors']}"
+        )
     return {
         "mode": "threaded",
         "workers": workers,
+        "transform_workers": transform_workers,
+        "load_workers": load_workers,
         "total_paintings": sample_size,
         "elapsed_seconds": elapsed,
         "throughput_per_second": throughput,
+        "bottleneck": report["bottleneck"],
+        "stages": stages,
+        "queues": queues,
     }
 
 
@@ -97,10 +144,30 @@ if __name__ == "__main__":
             run_threaded(workers=n_workers, sample_size=SAMPLE_SIZE, batch_size=BATCH_SIZE)
         )
 
+    print(
+        f"\n[THREADED — workers={STAGE_SWEEP_WORKERS}, varying transform and load threads]"
+    )
+    for transform_workers, load_workers in STAGE_CONFIGS:
+        print(f"\n  Config: transform_workers={transform_workers}, load_workers={load_workers}")
+        results.append(
+            run_threaded(
+                workers=STAGE_SWEEP_WORKERS,
+                sample_size=SAMPLE_SIZE,
+                batch_size=BATCH_SIZE,
+                transform_workers=transform_workers,
+                load_workers=load_workers,
+            )
+        )
+
     print("\n--- Results ---")
     for r in results:
         label = f"{r['mode']} workers={r['workers']}"
-        print(f"  {label}: {r['throughput_per_second']} artworks/s ({r['elapsed_seconds']}s)")
+        if r["mode"] == "threaded":
+            label += f" transform={r['transform_workers']} load={r['load_workers']}"
+        line = f"  {label}: {r['throughput_per_second']} artworks/s ({r['elapsed_seconds']}s)"
+        if r.get("bottleneck"):
+            line += f", bottleneck: {r['bottleneck']}"
+        print(line)
 
     output_path = "scripts/benchmark_etl_results.json"
     with open(output_path, "w") as f:
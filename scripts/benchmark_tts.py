@@ -0,0 +1,83 @@
+import json
+import logging
+import subprocess
+import time
+
+import numpy as np
+
+from src.services.piper_speaker import PIPER_VOICE_MAPPER, PiperSpeaker
+
+logging.getLogger("src.services.piper_speaker").setLevel(logging.WARNING)
+logging.basicConfig(level=logging.WARNING)
+
+N_RUNS = 5
+
+TEXTS = {
+    "short": "The Arnolfini Portrait was painted by Jan van Eyck in 1434.",
+    "medium": (
+        "The Arnolfini Portrait was painted by Jan van Eyck in 1434. It shows a merchant "
+        "and his wife in a room in Bruges, rendered with an almost impossible attention to "
+        "detail. The convex mirror on the back wall reflects two more figures entering the "
+        "room, one of them perhaps the painter himself."
+    ),
+}
+
+VOICES = [("en", "female"), ("es", "male"), ("ca", "female")]
+
+
+def synthesize_subprocess(speaker: PiperSpeaker, text: str) -> np.ndarray:
+    """The previous implementation: one `piper` process, and one model load, per call."""
+    cmd = ["piper", "--model", speaker.model_path, "--config", speaker.config_path, "--output-raw"]
+    if speaker.speaker:
+        cmd.extend(["--speaker", speaker.speaker])
+    result = subprocess.run(cmd, input=text.encode("utf-8"), capture_output=True, check=True)
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def time_runs(fn, n_runs: int) -> list[float]:
+    times = []
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        fn()
+        times.append(round(time.perf_counter() - start, 3))
+    return times
+
+
+def summarize(times: list[float]) -> dict:
+    return {
+        "runs": times,
+        "mean": round(sum(times) / len(times), 3),
+        "min": min(times),
+        "max": max(times),
+    }
+
+
+if __name__ == "__main__":
+    results = {}
+
+    for language, gender in VOICES:
+        model, speaker_id = PIPER_VOICE_MAPPER[(language, gender)]
+        label = f"{language}-{gender}"
+
+        load_start = time.perf_counter()
+        speaker = PiperSpeaker(model=model, speaker=speaker_id)
+        load_seconds = round(time.perf_counter() - load_start, 3)
+        print(f"\n[{label}] resident voice loaded in {load_seconds}s")
+
+        results[label] = {"load_seconds": load_seconds}
+        for text_label, text in TEXTS.items():
+            cold = time_runs(lambda: synthesize_subprocess(speaker, text), N_RUNS)
+            resident = time_runs(lambda: speaker.synthesize(text), N_RUNS)
+            results[label][text_label] = {
+                "cold_subprocess": summarize(cold),
+                "resident_session": summarize(resident),
+            }
+            print(
+                f"  {text_label}: cold mean={summarize(cold)['mean']}s  "
+                f"resident mean={summarize(resident)['mean']}s"
+            )
+
+    output_path = "scripts/tts_latency_results.json"
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output_path}")
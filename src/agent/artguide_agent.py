@@ -1,21 +1,37 @@
-import base64
+import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from typing import Any, Generator, TypedDict, List, Dict
 from langchain.chat_models import init_chat_model
+from langchain_core.runnables import RunnableConfig
 
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
 
 from src.agent.tools.api_tools import APITools
 from src.agent.tools.base_tools import BaseTools
-from src.agent.tools.llm_tools import LLMTools
-from config import api_config
+from src.agent.tools.llm_tools import ChatArtworkInfo, LLMTools
+from src.agent.tools.speech_pipeline import RecordedNarration, SpeechPipeline
+from src.services.description_cache import DescriptionCache
+from src.services.narration_store import NarrationStore
+from config import agent_config, api_config, description_cache_config, narration_store_config
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
 
 
 class State(TypedDict):
     image_path: str
+    # Per-run settings, so one compiled graph can serve every session
+    language: str
+    speaker: str
+    n_words: int
     results: List[Dict]
     top_result: Dict
     samples: List[float]
@@ -30,10 +46,12 @@ class ArtGuide:
 
     DURATION_TO_NUM_WORDS = {"short": 100, "medium": 150, "long": 200}
 
-    def __init__(self, config: Dict):
+    DESCRIPTION_MODEL = "mistral-small-2603"
+
+    def __init__(self, speculative: bool = None):
 
         self.mistral_2603_llm = init_chat_model(
-            model="mistral-small-2603",
+            model=self.DESCRIPTION_MODEL,
             model_provider="mistralai",
             api_key=os.environ["MISTRAL_API_KEY"],
         )
@@ -42,11 +60,6 @@ class ArtGuide:
             model_provider="mistralai",
             api_key=os.environ["MISTRAL_API_KEY"],
         )
-        # Configuration
-        self.language = config["language"]
-        self.speaker = config["speaker"]
-        self.n_words = self.DURATION_TO_NUM_WORDS[config["duration"]]
-
         # Tools
         api_url = api_config["url"]
         self.llm_tools = LLMTools(
@@ -59,29 +72,77 @@ class ArtGuide:
         self.api_tools = APITools(api_url)
         self.utils = BaseTools()
 
-        # Graph initialization
+        # Descriptions of recognized paintings, reused instead of regenerated. Versioned
+        # by every prompt the streamed description is generated from.
+        self.description_cache = DescriptionCache(**description_cache_config)
+        self._description_prompt_version = LLMTools.description_prompt_version()
+        # Narrations of the most viewed paintings, pregenerated by NarrationETL
+        self.narration_store = NarrationStore(narration_store_config["path"])
+        self._narration_version = self.narration_version()
+
+        # Speculative mode: the fallback's blind vision calls start with the search and
+        # are handed to deep_search_image through the run's resources (see _run_config),
+        # or cancelled if the search is confident.
+        self.speculative = agent_config["speculative"] if speculative is None else speculative
+        self._speculation_pool = ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="Speculation"
+        )
+        self._speculation_lock = threading.Lock()
+
+        self._speculation_stats = {
+            "launched": 0,
+            "used": 0,
+            "cancelled": 0,
+            "failed": 0,
+            "wasted_vision_calls": 0,
+            "seconds_saved": 0.0,
+        }
+
+        # Graph initialization: compiled once, then shared by every run
         self.graph_builder = StateGraph(State)
         self.graph = None
+        self.create_graph()
 
     # ========================= NODES =========================
 
-    def search_image_node(self, state: State) -> State:
-        # encode image to reach the API
-        with open(state["image_path"], "rb") as image_file:
-            image_bytes = image_file.read()
-            image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-        results = self.api_tools.search_painting(image_base64)
-        return {"results": results}
-
-    def set_top_painting_node(self, state: State) -> State:
+    def search_image_node(self, state: State, config: RunnableConfig) -> State:
+        speculation = self._start_speculation(state) if self.speculative else None
+        try:
+            results = self.api_tools.search_painting(state["image_path"])
+        except Exception:
+            if speculation is not None:
+                self._cancel_speculation(speculation)
+            raise
+        update = {"results": results}
+
+        if speculation is not None:
+            if self.route_deep_research(update) == "deep_search_image":
+                self._resources(config)["speculation"] = speculation
+            else:
+                self._cancel_speculation(speculation)
+        return update
+
+    def set_top_painting_node(self, state: State, config: RunnableConfig) -> State:
         top_painting = self.utils.get_top_result(state["results"])
-        if self.language != "en":
-            state["top_result"] = self.utils.translate_painting(top_painting, self.language)
+
+        # Popular paintings come pregenerated: no description call, no synthesis.
+        # Keyed on the indexed title, so this is checked before translating it.
+        recorded = self.narration_store.get(self.narration_key(top_painting, state))
+        if recorded is not None:
+            painting, samples, sr = recorded
+            logger.info(f"Serving stored narration: {top_painting.get('title')}")
+            get_stream_writer()({"description": painting["description"]})
+            narration = RecordedNarration(painting["description"], samples, sr)
+            self._resources(config)["narration"] = narration
+            return {"top_result": top_painting | painting}
+
+        if state["language"] != "en":
+            state["top_result"] = self.utils.translate_painting(top_painting, state["language"])
         else:
             state["top_result"] = top_painting
         return state
 
-    def deep_search_node(self, state) -> State:
+    def deep_search_node(self, state, config: RunnableConfig) -> State:
         candidates = [
             r
             for r in state.get("results", [])
@@ -89,9 +150,12 @@ class ArtGuide:
         ]
         painting = self.llm_tools.identify_artwork(
             image_path=state["image_path"],
-            language=self.language,
-            n_words=self.n_words,
+            language=state["language"],
+            n_words=state["n_words"],
             candidates=candidates,
+            blind_results=self._collect_speculation(
+                self._resources(config).pop("speculation", None)
+            ),
         )
 
         state["results"].insert(0, painting)  # unnecessary but consistent
@@ -102,26 +166,182 @@ class ArtGuide:
 
         return state
 
-    def generate_description_node(self, state) -> State:
-        title = state["top_result"]["title"]
+    def generate_description_node(self, state, config: RunnableConfig) -> State:
+        """Stream the description, narrating each sentence as soon as it is complete.
 
-        enriched = self.llm_tools.enrich_painting(
-            title=title, language=self.language, n_words=self.n_words
+        Partial descriptions and finished audio segments go out as custom stream
+        events; generate_speech collects the rest of the audio. Cached descriptions
+        skip the LLM and are queued for synthesis whole.
+        """
+        title = state["top_result"]["title"]
+        writer = get_stream_writer()
+        pipeline = SpeechPipeline(self.api_tools, state["speaker"], state["language"])
+        # Handed to generate_speech, or cancelled by _release_run if the run dies first
+        self._resources(config)["narration"] = pipeline
+
+        cache_key = DescriptionCache.key(
+            title,
+            state["language"],
+            state["n_words"],
+            self.DESCRIPTION_MODEL,
+            self._description_prompt_version,
         )
+        cached = self.description_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Description cache hit: {title}")
+            writer({"description": cached["description"]})
+            sentences, _ = self.utils.split_sentences(cached["description"], final=True)
+            for sentence in sentences:
+                pipeline.feed(sentence)
+            pipeline.close()
+            return {"top_result": cached | state["top_result"]}
+
+        partial, consumed = {}, 0
+        try:
+            for partial in self.llm_tools.stream_description(
+                title=title, language=state["language"], n_words=state["n_words"]
+            ):
+                description = partial.get("description") or ""
+                if len(description) == consumed:
+                    continue
+                sentences, end = self.utils.split_sentences(description[consumed:])
+                for sentence in sentences:
+                    pipeline.feed(sentence)
+                consumed += end
+                writer({"description": description})
+                for segment in pipeline.ready():
+                    writer({"audio_segment": segment})
+
+            if not partial.get("description"):
+                # The model ignored the JSON format; fall back to the structured call.
+                logger.warning("Streamed description came back empty, regenerating")
+                partial = self.llm_tools.enrich_painting(
+                    title=title, language=state["language"], n_words=state["n_words"]
+                )
+                consumed = 0
+            sentences, _ = self.utils.split_sentences(
+                partial["description"][consumed:], final=True
+            )
+            for sentence in sentences:
+                pipeline.feed(sentence)
+        finally:
+            pipeline.close()
+
+        enriched = ChatArtworkInfo(**partial).to_dict()
+        self.description_cache.put(cache_key, enriched)
         return {"top_result": enriched | state["top_result"]}
 
-    def generate_speech_node(self, state) -> State:
-        description = state["top_result"]["description"]
-        audio_data = self.api_tools.synthesize_speech(
-            text=description, speaker=self.speaker, language=self.language
-        )
+    def generate_speech_node(self, state, config: RunnableConfig) -> State:
+        resources = self._resources(config)
+        pipeline = resources.get("narration")
+        if pipeline is None:
+            # Deep-search path: the description arrived whole, so every sentence is
+            # queued at once and the first segment is out after one synthesis.
+            description = state["top_result"]["description"]
+            pipeline = SpeechPipeline(self.api_tools, state["speaker"], state["language"])
+            sentences, _ = self.utils.split_sentences(description, final=True)
+            for sentence in sentences:
+                pipeline.feed(sentence)
+            pipeline.close()
+            resources["narration"] = pipeline
+
+        writer = get_stream_writer()
+        for segment in pipeline.drain():
+            writer({"audio_segment": segment})
+        samples, sr = pipeline.result()
+        resources.pop("narration", None)
         return {
-            "samples": audio_data["samples"],
-            "sr": audio_data["sr"],
+            "samples": samples,
+            "sr": sr,
             "top_result": state["top_result"],  # also need in this frontend stage
             "status": "success",
         }
 
+    @classmethod
+    def narration_version(cls) -> str:
+        """What a stored narration was generated with, beyond its key fields.
+
+        The Piper voices are not part of it: rerun NarrationETL after changing them.
+        """
+        return f"{cls.DESCRIPTION_MODEL}:{LLMTools.description_prompt_version()}"
+
+    def narration_key(self, painting: Dict, state: State) -> str:
+        return NarrationStore.key(
+            painting.get("title"),
+            painting.get("artist"),
+            state["language"],
+            state["n_words"],
+            state["speaker"],
+            self._narration_version,
+        )
+
+    # ========================= SPECULATION =========================
+
+    def _start_speculation(self, state: State) -> Dict:
+        cancel = threading.Event()
+
+        def blind_opinions():
+            started_at = time.perf_counter()
+            results = self.llm_tools.blind_opinions(
+                state["image_path"], state["language"], state["n_words"], cancel
+            )
+            return results, time.perf_counter() - started_at
+
+        with self._speculation_lock:
+            self._speculation_stats["launched"] += 1
+        return {
+            "future": self._speculation_pool.submit(blind_opinions),
+            "cancel": cancel,
+            "started_at": time.perf_counter(),
+        }
+
+    def _cancel_speculation(self, speculation: Dict) -> None:
+        speculation["cancel"].set()
+        with self._speculation_lock:
+            self._speculation_stats["cancelled"] += 1
+            # Both requests are already in flight and get billed regardless.
+            self._speculation_stats["wasted_vision_calls"] += 2
+
+    def _collect_speculation(self, speculation: Dict) -> List[Dict]:
+        """Blind opinions started with the search, or None to compute them now."""
+        if speculation is None:
+            return None
+
+        head_start = time.perf_counter() - speculation["started_at"]
+        try:
+            blind_results, blind_seconds = speculation["future"].result()
+        except Exception as exc:
+            logger.warning(f"Speculative blind opinions failed, retrying inline: {exc}")
+            with self._speculation_lock:
+                self._speculation_stats["failed"] += 1
+            return None
+
+        # The fallback would only have started the blind calls now.
+        saved = min(head_start, blind_seconds)
+        with self._speculation_lock:
+            self._speculation_stats["used"] += 1
+            self._speculation_stats["seconds_saved"] += saved
+        logger.info(f"Speculative blind opinions used, {saved:.2f}s saved")
+        return blind_results
+
+    def speculation_stats(self) -> Dict:
+        with self._speculation_lock:
+            stats = dict(self._speculation_stats)
+        stats["seconds_saved"] = round(stats["seconds_saved"], 2)
+        stats["mean_seconds_saved"] = (
+            round(stats["seconds_saved"] / stats["used"], 2) if stats["used"] else None
+        )
+        return stats
+
+    def stats(self) -> Dict[str, Dict]:
+        """Counters of the agent's shortcuts since the process started, logged after
+        every run."""
+        return {
+            "speculation": self.speculation_stats(),
+            "description_cache": self.description_cache.stats(),
+            "narration_store": self.narration_store.stats(),
+        }
+
     # ========================= ROUTERS =========================
 
     def route_deep_research(self, state: State) -> str:
@@ -130,6 +350,12 @@ class ArtGuide:
             return "top_painting_selector"
         return "deep_search_image"
 
+    def route_recorded_narration(self, state: State) -> str:
+        # Only a stored narration leaves top_painting_selector already described
+        if state["top_result"].get("description"):
+            return "generate_speech"
+        return "generate_description"
+
     def route_non_painting(self, state: State) -> str:
         if "status" in state:
             return "__end__"
@@ -155,7 +381,15 @@ class ArtGuide:
         )
         # branch 1:  top_painting_selector >> generate_description (LLM) >> generate_speech >> END
         # if no results are obtained, we go to deep research, no condition for generate_speech
-        self.graph_builder.add_edge("top_painting_selector", "generate_description")
+        # a narration pregenerated by NarrationETL goes straight to generate_speech
+        self.graph_builder.add_conditional_edges(
+            source="top_painting_selector",
+            path=self.route_recorded_narration,
+            path_map={
+                "generate_description": "generate_description",
+                "generate_speech": "generate_speech",
+            },
+        )
         self.graph_builder.add_edge("generate_description", "generate_speech")
 
         # branch 2: deep_search_image (LLM) >> [generate_speech] >> END
@@ -170,30 +404,103 @@ class ArtGuide:
         self.graph_builder.add_edge("generate_speech", END)
         self.graph = self.graph_builder.compile()
 
-    def run(self, image_path: str) -> str:
-        self.create_graph()
+    def initial_state(self, image_path: str, config: Dict) -> State:
+        """Run input: the photo plus the visitor's language, speaker and duration."""
+        return {
+            "image_path": image_path,
+            "language": config["language"],
+            "speaker": config["speaker"],
+            "n_words": self.DURATION_TO_NUM_WORDS[config["duration"]],
+        }
 
-        initial_state: State = {"image_path": image_path}
-        state = self.graph.invoke(initial_state)
-        return state
+    # ========================= RUN RESOURCES =========================
+
+    @staticmethod
+    def _run_config() -> RunnableConfig:
+        """Graph config of one run, carrying its live objects (in-flight speculation,
+        speech pipelines) between nodes.
 
-    def run_streaming(self, image_path: str) -> Generator[Dict[str, Any], None, None]:
+        They can't travel in the state, which holds plain data, and must not outlive
+        the run on the shared agent: run and run_streaming release whatever a failed
+        or abandoned run left behind.
+        """
+        return {"configurable": {"resources": {}}}
+
+    @staticmethod
+    def _resources(config: RunnableConfig) -> Dict:
+        return config["configurable"]["resources"]
+
+    def _release_run(self, run_config: RunnableConfig) -> None:
+        resources = self._resources(run_config)
+        speculation = resources.pop("speculation", None)
+        if speculation is not None:
+            self._cancel_speculation(speculation)
+        narration = resources.pop("narration", None)
+        if narration is not None:
+            narration.cancel()
+        logger.info(f"Agent stats: {self.stats()}")
+
+    def run(self, image_path: str, config: Dict) -> str:
+        run_config = self._run_config()
+        try:
+            return self.graph.invoke(self.initial_state(image_path, config), run_config)
+        finally:
+            self._release_run(run_config)
+
+    def run_streaming(
+        self, image_path: str, config: Dict
+    ) -> Generator[Dict[str, Any], None, None]:
         """
         State updates at each step of the graph execution. Yields dictionaries with node name and
         updated state.
-        """
-        self.create_graph()
 
-        initial_state: State = {"image_path": image_path}
-
-        for event in self.graph.stream(initial_state):
-            for node_name, state_update in event.items():
-                yield {"node": node_name, "state": state_update, "timestamp": time.time()}
+        Narration progress arrives in between as {"node": "narration", "state": {},
+        "custom": {...}} events: the partial "description" as it is written, and each
+        "audio_segment" (index, text, samples, sr) as soon as it is synthesized. The
+        final generate_speech update still carries the full samples.
+        """
+        initial_state = self.initial_state(image_path, config)
+        run_config = self._run_config()
+
+        # The finally also runs when the consumer stops iterating (GeneratorExit).
+        try:
+            for mode, event in self.graph.stream(
+                initial_state, run_config, stream_mode=["updates", "custom"]
+            ):
+                if mode == "custom":
+                    yield {
+                        "node": "narration",
+                        "state": {},
+                        "custom": event,
+                        "timestamp": time.time(),
+                    }
+                    continue
+                for node_name, state_update in event.items():
+                    yield {"node": node_name, "state": state_update, "timestamp": time.time()}
+        finally:
+            self._release_run(run_config)
+
+
+_AGENT = None
+_AGENT_LOCK = threading.Lock()
+
+
+def get_artguide() -> ArtGuide:
+    """Process-wide ArtGuide: chat clients and the compiled graph are built on first use.
+
+    Runs keep their settings in the graph state, so concurrent sessions can share it.
+    """
+    global _AGENT
+    with _AGENT_LOCK:
+        if _AGENT is None:
+            _AGENT = ArtGuide()
+        return _AGENT
 
 
 if __name__ == "__main__":
     load_dotenv()
-    agent = ArtGuide({"language": "en", "speaker": "female", "duration": "short"})
+    agent = get_artguide()
+    config = {"language": "en", "speaker": "female", "duration": "short"}
     image_path = "/home/afalceto/artguide/img/the_balcony_manet.jpeg"
     # image_path = "/home/ubuntu/artguide/img/matrimoni_arnolfini.jpg"
-    agent.run(image_path=image_path)
+    agent.run(image_path=image_path, config=config)
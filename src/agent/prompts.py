@@ -76,3 +76,11 @@ class Prompts:
         "   6. Specify the museum where the painting is exposed "
         "   7. Specify the year the painting was created."
     )
+
+    # Appended to DESCRIPTION_GENERATION when the answer is streamed: with the
+    # description last, the short fields are complete before narration starts.
+    DESCRIPTION_JSON_FORMAT = (
+        "\n\nRespond with a single JSON object with exactly these keys, in this order: "
+        '"title", "artist", "year", "museum", "description". '
+        "Use null for any value you cannot determine."
+    )
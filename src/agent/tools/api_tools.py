@@ -1,10 +1,13 @@
 import os
 import logging
+import time
 from typing import Dict, List
 
 import numpy as np
 from requests import post
 
+from src.services.audio_codec import AUDIO_MEDIA_TYPES, decode_audio
+
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
@@ -14,6 +17,12 @@ logger = logging.getLogger(__name__)
 
 class APITools:
 
+    # The API sheds load with a 429 and a Retry-After; a narration is one /synthesize
+    # call per sentence, so one shed sentence must not fail the whole narration.
+    SHED_ATTEMPTS = 4
+    SHED_WAIT = 1.0  # seconds, multiplied by the attempt number, without a Retry-After
+    MAX_SHED_WAIT = 10.0
+
     def __init__(self, base_url: str):
         self.base_url = base_url
 
@@ -39,6 +48,27 @@ class APITools:
             )
             raise
 
+    def _post(self, endpoint: str, **kwargs):
+        """POST, retrying a bounded number of times while the API answers 429."""
+        for attempt in range(1, self.SHED_ATTEMPTS + 1):
+            response = post(**kwargs)
+            if response.status_code != 429 or attempt == self.SHED_ATTEMPTS:
+                return response
+            wait = self._retry_after(response, attempt)
+            logger.warning(
+                f"{endpoint} shed by the API (attempt {attempt}/{self.SHED_ATTEMPTS}), "
+                f"retrying in {wait:.1f}s"
+            )
+            response.close()
+            time.sleep(wait)
+
+    def _retry_after(self, response, attempt: int) -> float:
+        try:
+            wait = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):  # absent, or an HTTP date
+            wait = self.SHED_WAIT * attempt
+        return min(max(wait, 0.0), self.MAX_SHED_WAIT)
+
     def _get_headers(self) -> Dict:
         return {
             "Authorization": f"Bearer {os.getenv('API_TOKEN')}",
@@ -46,14 +76,17 @@ class APITools:
         }
 
     def search_painting(self, image_path: str) -> List[Dict]:
-        """Searches for a painting in the Qdrant DB."""
+        """Searches for a painting in the Qdrant DB.
 
-        params = {"image_data": image_path}
-        response = post(
-            url=f"{self.base_url}/search",
-            headers=self._get_headers(),
-            json=params,
-        )
+        The file is streamed as the raw request body, not base64-encoded into JSON.
+        """
+
+        with open(image_path, "rb") as image_file:
+            response = post(
+                url=f"{self.base_url}/search",
+                headers=self._get_headers() | {"Content-Type": "application/octet-stream"},
+                data=image_file,
+            )
         results = self._parse(response, "search_painting")
         top_score = results[0].get("score") if results else None
         logger.info(f"Vector search returned {len(results)} results, top score={top_score}")
@@ -62,17 +95,32 @@ class APITools:
         return results
 
     def synthesize_speech(self, text: str, speaker: str, language: str) -> Dict:
-        """Perform voice synthesis"""
+        """Perform voice synthesis.
+
+        Audio comes back as raw int16 PCM rather than a JSON float list -- a fraction of
+        the bytes, and converted straight from the response body instead of parsed.
+        Either way the samples are float32 in [-1, 1].
+        """
 
         logger.info(f"Generating audio for text length: {len(text)}")
 
         params = {"text": text, "speaker": speaker, "language": language}
 
-        response = post(
+        response = self._post(
+            "synthesize_speech",
             url=f"{self.base_url}/synthesize",
-            headers=self._get_headers(),
+            headers=self._get_headers() | {"Accept": AUDIO_MEDIA_TYPES["pcm"]},
             json=params,
         )
-        results = self._parse(response, "synthesize_speech")
+        if not response.ok:
+            self._parse(response, "synthesize_speech")
+
+        audio_format = response.headers.get("X-Audio-Format")
+        if audio_format is None:  # an API that predates binary transport answers JSON
+            results = self._parse(response, "synthesize_speech")
+            return {"samples": np.array(results["samples"], dtype=np.float32), "sr": results["sr"]}
 
-        return {"samples": np.array(results["samples"], dtype=np.float32), "sr": results["sr"]}
+        return {
+            "samples": decode_audio(response.content, audio_format),
+            "sr": int(response.headers["X-Sample-Rate"]),
+        }
@@ -1,5 +1,6 @@
 import logging
-from typing import Dict, List
+import re
+from typing import Dict, List, Tuple
 from requests import get
 
 logging.basicConfig(
@@ -11,6 +12,41 @@ logger = logging.getLogger(__name__)
 class BaseTools:
     """General tools for agent."""
 
+    # End of a sentence: terminal punctuation, any closing quotes or brackets, then space
+    SENTENCE_END = re.compile(r"(?<=[.!?…])[\"'»”)\]]*\s+")
+    # Periods that don't end a sentence: abbreviations ("c. 1503", "St. Jerome", "Sra.")
+    # and initials ("J. M. W. Turner")
+    ABBREVIATION = re.compile(
+        r"(?:\b(?:c|ca|St|Sta|Sto|Sr|Sra|Dr|Mr|Mrs|Mt|Jr|vol|núm)|\b[A-ZÀ-Ý])\.$"
+    )
+    # Shorter pieces are kept with the following text rather than synthesized alone
+    MIN_SENTENCE_CHARS = 20
+
+    @classmethod
+    def split_sentences(cls, text: str, final: bool = False) -> Tuple[List[str], int]:
+        """Cut the complete sentences off the front of a growing text.
+
+        Returns them with the index where the unfinished rest begins; with final=True
+        the rest counts as a last sentence.
+        """
+        sentences, start = [], 0
+        for match in cls.SENTENCE_END.finditer(text):
+            if match.end() - start < cls.MIN_SENTENCE_CHARS:
+                continue
+            if match.end() == len(text) and not final:
+                break  # what follows decides, and it hasn't arrived yet
+            if cls.ABBREVIATION.search(text, start, match.start()):
+                continue
+            # A number right after the period continues the sentence ("c. 1503")
+            if text[match.end() : match.end() + 1].isdigit():  # noqa
+                continue
+            sentences.append(text[start : match.end()].strip())  # noqa
+            start = match.end()
+        if final and text[start:].strip():
+            sentences.append(text[start:].strip())
+            start = len(text)
+        return sentences, start
+
     @staticmethod
     def score_meets_threshold(score: float, threshold: float) -> bool:
         return score >= threshold
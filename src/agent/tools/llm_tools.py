@@ -1,14 +1,17 @@
 import base64
 import logging
 import string
+import threading
 import time
 from numpy import random
 from pydantic import BaseModel
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Generator, List, Optional, Union
 from concurrent.futures import ThreadPoolExecutor
 
 from src.agent.prompts import Prompts
+from src.services.description_cache import DescriptionCache
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.output_parsers import JsonOutputParser
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
@@ -80,50 +83,29 @@ class LLMTools:
         self.structured_output_method = structured_output_method
 
     def identify_artwork(
-        self, image_path: str, language: str, n_words: int, candidates: List[Dict] = None
+        self,
+        image_path: str,
+        language: str,
+        n_words: int,
+        candidates: List[Dict] = None,
+        blind_results: List[Dict] = None,
     ) -> Dict:
         """Identifies painting via two independent blind LLM opinions plus CLIP's
         own candidate (when available), arbitrated by a judge call over anonymized
         options. Neither blind model ever sees the other's answer or CLIP's hint --
-        that anchoring is exactly what we're avoiding here."""
+        that anchoring is exactly what we're avoiding here.
+
+        `blind_results` are opinions already gathered with `blind_opinions`, e.g. by a
+        speculative call started before the CLIP search came back."""
 
         first_model_inference = self.first_vision_model.with_structured_output(
             ChatArtworkInfo, method=self.structured_output_method
         )
-        second_model_inference = self.second_vision_model.with_structured_output(
-            ChatArtworkInfo, method=self.structured_output_method
-        )
-
-        with open(image_path, "rb") as img:
-            image_b64 = base64.b64encode(img.read()).decode("utf-8")
-
-        image_content = {
-            "type": "image_url",
-            "image_url": {"url": "data:image/jpeg;base64," + image_b64},
-        }
+        image_content = self._image_content(image_path)
 
-        logger.info(f"Deep analysis on image: {image_path} ({len(image_b64) / 1e6:.2f}MB base64)")
-
-        blind_prompt = self.prompts.ART_IDENTIFICATION_PROMPT.format(
-            language=self.LANGUAGE_MAPPER[language],
-            n_words=n_words,
-        )
-        blind_messages = [
-            SystemMessage(content=self.prompts.SYSTEM_GUIDELINES),
-            HumanMessage(content=[{"type": "text", "text": blind_prompt}, image_content]),
-        ]
-
-        # The two blind calls are independent network requests -- run them
-        # concurrently so wall-clock cost is bounded by the slower one, not the sum.
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            first_future = executor.submit(
-                self._invoke_blind, blind_messages, first_model_inference, "first_vision_model"
-            )
-            second_future = executor.submit(
-                self._invoke_blind, blind_messages, second_model_inference, "second_vision_model"
-            )
-            first_result = first_future.result()
-            second_result = second_future.result()
+        if blind_results is None:
+            blind_results = self.blind_opinions(image_path, language, n_words)
+        first_result, second_result = blind_results
 
         logger.info(
             f"Blind opinions -- "
@@ -192,6 +174,117 @@ class LLMTools:
         logger.info(f"Identified: title={result['title']!r} artist={result['artist']!r}")
         return result
 
+    def stream_description(
+        self, title: str, language: str, n_words: int
+    ) -> Generator[Dict, None, None]:
+        """enrich_painting's answer as it is generated: a growing partial dict per chunk.
+
+        Asks for plain JSON with the description last, so narration can start on the
+        first sentences while the rest is still being written.
+        """
+
+        logger.info(f"Streaming description: {title}")
+        chain = (
+            self.description_model.bind(response_format={"type": "json_object"})
+            | JsonOutputParser()
+        )
+
+        prompt = self.prompts.DESCRIPTION_GENERATION.format(
+            language=language, n_words=n_words, title=title
+        )
+        messages = [
+            SystemMessage(content=self.prompts.SYSTEM_GUIDELINES),
+            HumanMessage(content=prompt + self.prompts.DESCRIPTION_JSON_FORMAT),
+        ]
+        for partial in chain.stream(messages):
+            if isinstance(partial, dict):
+                yield partial
+
+    def describe_painting(self, title: str, language: str, n_words: int) -> Dict:
+        """stream_description run to completion, for callers with no use for partials.
+
+        Falls back to enrich_painting if the model ignored the JSON format.
+        """
+        partial = {}
+        for partial in self.stream_description(title=title, language=language, n_words=n_words):
+            pass
+        if not partial.get("description"):
+            logger.warning(f"Streamed description of {title!r} came back empty, regenerating")
+            return self.enrich_painting(title=title, language=language, n_words=n_words)
+        return ChatArtworkInfo(**partial).to_dict()
+
+    @classmethod
+    def description_prompt_version(cls) -> str:
+        """Fingerprint of every prompt a streamed description is generated from."""
+        return DescriptionCache.prompt_version(
+            Prompts.SYSTEM_GUIDELINES,
+            Prompts.DESCRIPTION_GENERATION,
+            Prompts.DESCRIPTION_JSON_FORMAT,
+        )
+
+    def blind_opinions(
+        self,
+        image_path: str,
+        language: str,
+        n_words: int,
+        cancel: threading.Event = None,
+    ) -> Optional[List[Dict]]:
+        """The two blind identifications of identify_artwork, as [first, second].
+
+        Once `cancel` is set, failed calls are no longer retried and None is returned;
+        requests already in flight can't be recalled and run to completion.
+        """
+        first_model_inference = self.first_vision_model.with_structured_output(
+            ChatArtworkInfo, method=self.structured_output_method
+        )
+        second_model_inference = self.second_vision_model.with_structured_output(
+            ChatArtworkInfo, method=self.structured_output_method
+        )
+        image_content = self._image_content(image_path)
+        logger.info(f"Deep analysis on image: {image_path}")
+
+        blind_prompt = self.prompts.ART_IDENTIFICATION_PROMPT.format(
+            language=self.LANGUAGE_MAPPER[language],
+            n_words=n_words,
+        )
+        blind_messages = [
+            SystemMessage(content=self.prompts.SYSTEM_GUIDELINES),
+            HumanMessage(content=[{"type": "text", "text": blind_prompt}, image_content]),
+        ]
+
+        # The two blind calls are independent network requests -- run them
+        # concurrently so wall-clock cost is bounded by the slower one, not the sum.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first_future = executor.submit(
+                self._invoke_blind,
+                blind_messages,
+                first_model_inference,
+                "first_vision_model",
+                cancel,
+            )
+            second_future = executor.submit(
+                self._invoke_blind,
+                blind_messages,
+                second_model_inference,
+                "second_vision_model",
+                cancel,
+            )
+            first_result = first_future.result()
+            second_result = second_future.result()
+
+        if cancel is not None and cancel.is_set():
+            return None
+        return [first_result, second_result]
+
+    @staticmethod
+    def _image_content(image_path: str) -> Dict:
+        with open(image_path, "rb") as img:
+            image_b64 = base64.b64encode(img.read()).decode("utf-8")
+        return {
+            "type": "image_url",
+            "image_url": {"url": "data:image/jpeg;base64," + image_b64},
+        }
+
     def enrich_painting(self, title: str, language: str, n_words: int) -> str:
         """Generates painting description and enriches painting info"""
 
@@ -208,8 +301,16 @@ class LLMTools:
 
         return response.to_dict()
 
-    def _invoke_blind(self, blind_messages: List, model_inference: Any, model_label: str) -> Dict:
+    def _invoke_blind(
+        self,
+        blind_messages: List,
+        model_inference: Any,
+        model_label: str,
+        cancel: threading.Event = None,
+    ) -> Optional[Dict]:
         for attempt in range(1, self.MODEL_ATTEMPTS + 1):
+            if cancel is not None and cancel.is_set():
+                return None
             try:
                 response = model_inference.invoke(blind_messages)
                 return response.to_dict()
@@ -0,0 +1,117 @@
+import logging
+import threading
+from queue import Empty, Queue
+from typing import Dict, Generator, List, Tuple
+
+import numpy as np
+
+from src.agent.tools.api_tools import APITools
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class SpeechPipeline:
+    """Synthesizes a narration sentence by sentence while the text is still arriving.
+
+    Sentences are fed as they complete and synthesized in order by one worker thread,
+    so the first audio segment is ready one sentence after the first sentence is.
+    Finished segments are collected with `ready()` (non-blocking) or `drain()`.
+    """
+
+    def __init__(self, api_tools: APITools, speaker: str, language: str):
+        self.api_tools = api_tools
+        self.speaker = speaker
+        self.language = language
+
+        self._sentences: Queue = Queue()
+        self._segments: Queue = Queue()
+        self._taken: List[Dict] = []
+        self._error = None
+        self._cancelled = threading.Event()
+        self._worker = threading.Thread(target=self._synthesize, name="SpeechPipeline")
+        self._worker.start()
+
+    def feed(self, sentence: str) -> None:
+        # Markdown emphasis is dropped as from a whole description (ChatArtworkInfo)
+        sentence = sentence.replace("*", "").strip()
+        if sentence:
+            self._sentences.put(sentence)
+
+    def close(self) -> None:
+        """No more sentences; the worker stops once the queued ones are synthesized."""
+        self._sentences.put(None)
+
+    def cancel(self) -> None:
+        """Abandon the narration: queued sentences are dropped and the worker stops."""
+        self._cancelled.set()
+        self._sentences.put(None)
+
+    def _synthesize(self) -> None:
+        index = 0
+        while (sentence := self._sentences.get()) is not None:
+            if self._error is not None or self._cancelled.is_set():
+                continue  # keep consuming until close() so feeders never block
+            try:
+                audio = self.api_tools.synthesize_speech(
+                    text=sentence, speaker=self.speaker, language=self.language
+                )
+            except Exception as exc:
+                logger.error(f"Synthesis of sentence {index} failed: {exc}")
+                self._error = exc
+                continue
+            self._segments.put(
+                {"index": index, "text": sentence, "samples": audio["samples"], "sr": audio["sr"]}
+            )
+            index += 1
+        self._segments.put(None)
+
+    def ready(self) -> List[Dict]:
+        """Segments finished since the last call, without waiting."""
+        segments = []
+        while True:
+            try:
+                segment = self._segments.get_nowait()
+            except Empty:
+                break
+            if segment is None:
+                self._segments.put(None)  # leave the end marker for drain()
+                break
+            segments.append(segment)
+        self._taken.extend(segments)
+        return segments
+
+    def drain(self) -> Generator[Dict, None, None]:
+        """Remaining segments as they finish; call after close(). Re-raises failures."""
+        while (segment := self._segments.get()) is not None:
+            self._taken.append(segment)
+            yield segment
+        self._worker.join()
+        if self._error is not None:
+            raise self._error
+
+    def result(self) -> Tuple[np.ndarray, int]:
+        """The whole narration, once drained: all segments joined, and the sample rate."""
+        if not self._taken:
+            raise ValueError("No audio was synthesized")
+        samples = np.concatenate([segment["samples"] for segment in self._taken])
+        return samples, self._taken[0]["sr"]
+
+
+class RecordedNarration:
+    """A narration synthesized ahead of time, served through SpeechPipeline's interface
+    so generate_speech treats it like a live one: a single segment, already complete."""
+
+    def __init__(self, text: str, samples: np.ndarray, sr: int):
+        self._segment = {"index": 0, "text": text, "samples": samples, "sr": sr}
+
+    def drain(self) -> Generator[Dict, None, None]:
+        yield self._segment
+
+    def cancel(self) -> None:
+        pass
+
+    def result(self) -> Tuple[np.ndarray, int]:
+        return self._segment["samples"], self._segment["sr"]
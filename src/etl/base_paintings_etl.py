@@ -1,24 +1,69 @@
+import json
 import logging
+import os
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from queue import Queue
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 
 
 from abc import ABC, abstractmethod
 
+from config import etl_config
+from src.etl.etl_metrics import ETLMetrics
+from src.services.embedding_pool import EmbeddingPool
+from src.services.qdrant_db import QdrantDB
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
 class BasePaintingsETL(ABC):
-    def __init__(self, batch_size=600, workers=5):
+    # Names the checkpoint file; children override it so their checkpoints don't collide.
+    name = "etl"
+
+    def __init__(
+        self, batch_size=600, workers=5, transform_workers=1, load_workers=1, embed_workers=0
+    ):
         self.batch_size = batch_size
         self.workers = workers
+        self.transform_workers = transform_workers
+        self.load_workers = load_workers
+        # Processes of the embed stage; 0 leaves embedding to load()
+        self.embed_workers = embed_workers
+        self.embedding_pool = None
 
-        # Pipeline Queues
+        # Shared by every transform worker and batch, so `workers` bounds the total
+        # per-item concurrency and threads aren't respawned for each batch. Only set
+        # within transform_executor(), which run() enters for the whole pipeline.
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+        # Pipeline Queues: items are (seq, batch, cursor), plus a future of the batch's
+        # embeddings on the load queue; None is the stop signal
         self.transform_queue = Queue(maxsize=10)
         self.load_queue = Queue(maxsize=10)
 
+        # Checkpointing: extract() sets extract_cursor to where the source should be
+        # read from once the batch it is about to yield has been loaded, and reads
+        # resume_cursor to pick up from a previous run.
+        self.extract_cursor: Optional[Dict] = None
+        self.resume_cursor: Optional[Dict] = None
+        self._checkpoint_lock = threading.Lock()
+        self._loaded: Dict[int, Optional[Dict]] = {}
+        self._next_seq = 0
+
+        # Per-stage timings and queue depths of the current run
+        self.metrics = self._new_metrics()
+        self.metrics_report_path = None
+
+    def _new_metrics(self) -> ETLMetrics:
+        return ETLMetrics(
+            self.name, {"transform_queue": self.transform_queue, "load_queue": self.load_queue}
+        )
+
     # ========== ETL STAGES - To define in children classes ==========
     @abstractmethod
     def extract(self):
@@ -29,29 +74,99 @@ class BasePaintingsETL(ABC):
         pass
 
     @abstractmethod
-    def load(self, batch: List[Dict]) -> None:
+    def load(self, batch: List[Dict], embeddings=None) -> None:
         pass
 
+    # ========== EMBED STAGE - Optional, for children that embed before loading ==========
+    def embedding_loader(self) -> Optional[Callable]:
+        """Picklable callable that loads the embedding model in each embed process."""
+        return None
+
+    def embedding_texts(self, batch: List[Dict]) -> List[str]:
+        """Texts to embed for a transformed batch, one per item: by default the text
+        QdrantDB embeds a painting from, so precomputed vectors match ingest_paintings."""
+        return [QdrantDB.painting_text(painting) for painting in batch]
+
+    # ========== CHECKPOINTS ==========
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(etl_config["state_dir"], "checkpoints", f"{self.name}.json")
+
+    def read_checkpoint(self) -> Optional[Dict]:
+        """Return the last saved checkpoint, or None if there is none."""
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_checkpoint(self, cursor: Optional[Dict]) -> None:
+        """Atomically persist the cursor of the last contiguously loaded batch."""
+        checkpoint = {
+            "cursor": cursor,
+            "batches_loaded": self._next_seq,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def mark_loaded(self, seq: int, cursor: Optional[Dict]) -> None:
+        """Record a loaded batch and advance the checkpoint if it closes a gap.
+
+        Batches can finish out of order, so the checkpoint only moves to the cursor
+        of the highest seq below which every batch has been loaded; a batch that
+        failed holds it back and is redone on resume.
+        """
+        with self._checkpoint_lock:
+            self._loaded[seq] = cursor
+            if self._next_seq not in self._loaded:
+                return
+            while self._next_seq in self._loaded:
+                cursor = self._loaded.pop(self._next_seq)
+                self._next_seq += 1
+            self.save_checkpoint(cursor)
+
     # ========== WORKERS ==========
     def run_transform_thread(self):
         """
         Thread that:
         1. Retrieves batches from transform_queue
         2. Transforms them
-        3. Places them in load_queue
+        3. Hands them to the embed stage, if any
+        4. Places them in load_queue
         """
 
         while True:
-            batch = self.transform_queue.get()
+            waiting_since = time.perf_counter()
+            item = self.transform_queue.get()
+            wait = time.perf_counter() - waiting_since
 
-            if batch is None:
-                self.load_queue.put(None)  # last message
+            if item is None:
+                self.metrics.record("transform", wait=wait, batches=0)
                 logger.info("Transform worker received stop signal")
                 self.transform_queue.task_done()
                 break
 
-            enriched = self.transform(batch)
-            self.load_queue.put(enriched)
+            seq, batch, cursor = item
+            started_at, error = time.perf_counter(), False
+            try:
+                enriched = self.transform(batch)
+                # The pool encodes while this thread moves on to the next batch
+                embeddings = None
+                if self.embedding_pool and enriched:
+                    embeddings = self.embedding_pool.submit(self.embedding_texts(enriched))
+                busy = time.perf_counter() - started_at
+
+                waiting_since = time.perf_counter()
+                self.load_queue.put((seq, enriched, cursor, embeddings))
+                wait += time.perf_counter() - waiting_since
+            except Exception:
+                error, busy = True, time.perf_counter() - started_at
+                logger.exception(f"Transform of batch {seq} failed")
+            self.metrics.record("transform", len(batch), busy, wait, error)
             self.transform_queue.task_done()
 
         logger.info("Transform worker stopped")
@@ -61,45 +176,135 @@ class BasePaintingsETL(ABC):
         Thread that:
         1. Retrieves batches from load_queue
         2. Loads them into the DB
+        3. Checkpoints the progress
         """
         while True:
-            batch = self.load_queue.get()
+            waiting_since = time.perf_counter()
+            item = self.load_queue.get()
+            wait = time.perf_counter() - waiting_since
 
-            if batch is None:
+            if item is None:
+                self.metrics.record("load", wait=wait, batches=0)
                 logger.info("Load worker received stop signal")
                 self.load_queue.task_done()
                 break
 
-            self.load(batch)
+            seq, batch, cursor, embeddings = item
+            started_at, error = time.perf_counter(), False
+            try:
+                if embeddings is not None:
+                    # The embed stage is busy for as long as its worker encoded; this
+                    # thread blocking on it is load waiting for input, not working.
+                    embeddings, encode_seconds = embeddings.result()
+                    wait += time.perf_counter() - started_at
+                    self.metrics.record("embed", len(batch), busy=encode_seconds)
+                    started_at = time.perf_counter()
+                self.load(batch, embeddings)
+                self.mark_loaded(seq, cursor)
+            except Exception:
+                error = True
+                logger.exception(f"Load of batch {seq} failed")
+            busy = time.perf_counter() - started_at
+            self.metrics.record("load", len(batch), busy, wait, error)
             self.load_queue.task_done()
 
         logger.info("Load worker stopped")
 
     # ========== ORCHESTRATOR ==========
-    def run(self):
+    @contextmanager
+    def transform_executor(self):
+        """Create the shared transform executor, and shut it down on the way out.
+
+        run() holds it for the whole pipeline; callers driving transform() themselves
+        (e.g. a sequential benchmark) enter it around their own loop.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Transform")
+        try:
+            yield self.executor
+        finally:
+            self.executor.shutdown()
+            self.executor = None
+
+    def run(self, resume: bool = False):
         logger.info("Starting ETL pipeline...")
 
-        # Create threads that execute worker functions
-        transform_thread = threading.Thread(
-            target=self.run_transform_thread, name="TransformWorker"
-        )
-        load_thread = threading.Thread(target=self.run_load_thread, name="LoadWorker")
+        self.resume_cursor = self.extract_cursor = None
+        if resume:
+            checkpoint = self.read_checkpoint()
+            if checkpoint:
+                self.resume_cursor = checkpoint["cursor"]
+                logger.info(f"Resuming from checkpoint {self.checkpoint_path}: {checkpoint}")
+            else:
+                logger.info("No checkpoint found, starting from scratch")
 
-        # Start the threads
-        transform_thread.start()
-        load_thread.start()
+        # Fresh per-run state, so the same instance can run again
+        self.metrics = self._new_metrics()
+        self._loaded, self._next_seq = {}, 0
 
-        # Main thread: extract and feed the pipeline
-        try:
-            for batch in self.extract():
-                self.transform_queue.put(batch)
-                logger.info("Batch queued for transformation")
-        finally:
-            self.transform_queue.put(None)
-            logger.info("Extraction completed, sent stop signal")
+        embedding_loader = self.embedding_loader() if self.embed_workers else None
+        self.embedding_pool = None
+        if embedding_loader:
+            self.embedding_pool = EmbeddingPool(embedding_loader, self.embed_workers)
+
+        with self.transform_executor():
+            # Create threads that execute worker functions
+            transform_threads = [
+                threading.Thread(target=self.run_transform_thread, name=f"TransformWorker-{i}")
+                for i in range(self.transform_workers)
+            ]
+            load_threads = [
+                threading.Thread(target=self.run_load_thread, name=f"LoadWorker-{i}")
+                for i in range(self.load_workers)
+            ]
+
+            # Start the threads
+            self.metrics.start()
+            for thread in transform_threads + load_threads:
+                thread.start()
 
-        # Wait until they finish
-        transform_thread.join()
-        load_thread.join()
+            # Main thread: extract and feed the pipeline. If extraction fails, what was
+            # already extracted is still loaded and checkpointed before the error is raised.
+            extract_error = None
+            try:
+                started_at = time.perf_counter()
+                for seq, batch in enumerate(self.extract()):
+                    busy = time.perf_counter() - started_at
+                    waiting_since = time.perf_counter()
+                    self.transform_queue.put((seq, batch, self.extract_cursor))
+                    wait = time.perf_counter() - waiting_since
+                    self.metrics.record("extract", len(batch), busy, wait)
+                    logger.info("Batch queued for transformation")
+                    started_at = time.perf_counter()
+            except Exception as e:
+                extract_error = e
+                logger.exception("Extraction failed, finishing the batches already extracted")
+            finally:
+                # One stop signal per worker: each consumes exactly one and exits
+                for _ in transform_threads:
+                    self.transform_queue.put(None)
+                logger.info("Extraction completed, sent stop signal")
 
-        logger.info("ETL pipeline completed!")
+            # Load workers are only stopped once no transform worker can still feed them
+            for thread in transform_threads:
+                thread.join()
+            for _ in load_threads:
+                self.load_queue.put(None)
+            for thread in load_threads:
+                thread.join()
+        if self.embedding_pool:
+            self.embedding_pool.shutdown()
+            self.metrics.record_idle("embed", self.embed_workers)
+
+        self.metrics.stop()
+        report = self.metrics.report()
+        self.metrics_report_path = self.metrics.write(
+            os.path.join(etl_config["state_dir"], "reports"),
+            prometheus=etl_config.get("prometheus", False),
+        )
+        logger.info(
+            f"ETL pipeline completed in {report['elapsed_seconds']}s, "
+            f"bottleneck: {report['bottleneck']}. Report: {self.metrics_report_path}"
+        )
+        if extract_error is not None:
+            raise extract_error
+        return report
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+import time
+from queue import Queue
+from typing import Dict, List
+
+import numpy as np
+
+
+class StageMetrics:
+    """Counters of one pipeline stage, summed over all of its worker threads."""
+
+    def __init__(self):
+        self.items = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def summary(self, elapsed: float) -> Dict:
+        active = self.busy_seconds + self.wait_seconds
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            # Share of the stage's thread time spent working rather than blocked on a
+            # queue; the stage closest to 1 is the bottleneck.
+            "utilization": round(self.busy_seconds / active, 3) if active else None,
+            "items_per_busy_second": round(self.items / self.busy_seconds, 2)
+            if self.busy_seconds
+            else None,
+            "items_per_second": round(self.items / elapsed, 2) if elapsed else None,
+        }
+
+
+class ETLMetrics:
+    """Per-stage timings and queue occupancy of one BasePaintingsETL run.
+
+    Workers report how long each batch kept them busy and how long they waited on
+    their queues (for input, or for room downstream). A sampler thread records the
+    depth of every queue every `sample_interval` seconds.
+    """
+
+    def __init__(self, etl_name: str, queues: Dict[str, Queue], sample_interval: float = 0.5):
+        self.etl_name = etl_name
+        self.queues = queues
+        self.sample_interval = sample_interval
+
+        self.stages: Dict[str, StageMetrics] = {}
+        self.queue_samples: Dict[str, List] = {name: [] for name in queues}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._started_at = None
+        self._finished_at = None
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name="QueueSampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._finished_at = time.perf_counter()
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            offset = round(time.perf_counter() - self._started_at, 3)
+            for name, queue in self.queues.items():
+                self.queue_samples[name].append((offset, queue.qsize()))
+
+    def record(
+        self,
+        stage: str,
+        items: int = 0,
+        busy: float = 0.0,
+        wait: float = 0.0,
+        error: bool = False,
+        batches: int = 1,
+    ) -> None:
+        with self._lock:
+            metrics = self.stages.setdefault(stage, StageMetrics())
+            metrics.items += items
+            metrics.batches += batches
+            metrics.errors += error
+            metrics.busy_seconds += busy
+            metrics.wait_seconds += wait
+
+    def record_idle(self, stage: str, workers: int) -> None:
+        """Count a pool stage's idle time as waiting, once the run is over.
+
+        Pools such as the embed processes only report the time they worked; whatever
+        is left of `workers` x the run's duration they spent idle, waiting for input.
+        """
+        with self._lock:
+            metrics = self.stages.setdefault(stage, StageMetrics())
+            idle = workers * self.elapsed - metrics.busy_seconds - metrics.wait_seconds
+            metrics.wait_seconds += max(0.0, idle)
+
+    @property
+    def elapsed(self) -> float:
+        end = self._finished_at or time.perf_counter()
+        return end - self._started_at if self._started_at else 0.0
+
+    def report(self) -> Dict:
+        elapsed = self.elapsed
+        with self._lock:
+            stages = {name: m.summary(elapsed) for name, m in self.stages.items()}
+
+        queues = {}
+        for name, samples in self.queue_samples.items():
+            depths = np.array([depth for _, depth in samples]) if samples else np.zeros(1)
+            queues[name] = {
+                "maxsize": self.queues[name].maxsize,
+                "mean_depth": round(float(depths.mean()), 2),
+                "max_depth": int(depths.max()),
+                # Full means the consumer is the bottleneck, empty means the producer.
+                "full_share": round(float(np.mean(depths >= self.queues[name].maxsize)), 3),
+                "empty_share": round(float(np.mean(depths == 0)), 3),
+                "samples": samples,
+            }
+
+        utilization = {n: s["utilization"] for n, s in stages.items() if s["utilization"]}
+        return {
+            "etl": self.etl_name,
+            "elapsed_seconds": round(elapsed, 3),
+            "bottleneck": max(utilization, key=utilization.get) if utilization else None,
+            "stages": stages,
+            "queues": queues,
+        }
+
+    def to_prometheus(self) -> str:
+        """The report's counters in the Prometheus text exposition format."""
+        report = self.report()
+        etl = report["etl"]
+        metrics = [
+            ("items_total", "counter", "Items processed", "items"),
+            ("batches_total", "counter", "Batches processed", "batches"),
+            ("errors_total", "counter", "Batches that failed", "errors"),
+            ("busy_seconds_total", "counter", "Thread time spent working", "busy_seconds"),
+            ("wait_seconds_total", "counter", "Thread time spent blocked", "wait_seconds"),
+        ]
+        lines = []
+        for name, kind, help_text, key in metrics:
+            lines += [
+                f"# HELP artguide_etl_stage_{name} {help_text}, per stage",
+                f"# TYPE artguide_etl_stage_{name} {kind}",
+            ]
+            for stage, summary in report["stages"].items():
+                lines.append(
+                    f'artguide_etl_stage_{name}{{etl="{etl}",stage="{stage}"}} {summary[key]}'
+                )
+
+        lines += [
+            "# HELP artguide_etl_queue_mean_depth Mean sampled queue depth",
+            "# TYPE artguide_etl_queue_mean_depth gauge",
+        ]
+        for queue, summary in report["queues"].items():
+            lines.append(
+                f'artguide_etl_queue_mean_depth{{etl="{etl}",queue="{queue}"}} '
+                f'{summary["mean_depth"]}'
+            )
+        lines += [
+            "# HELP artguide_etl_elapsed_seconds Duration of the run",
+            "# TYPE artguide_etl_elapsed_seconds gauge",
+            f'artguide_etl_elapsed_seconds{{etl="{etl}"}} {report["elapsed_seconds"]}',
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str, prometheus: bool = False) -> str:
+        """Write the JSON report (and optionally a .prom file) and return the JSON path."""
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{self.etl_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        with open(f"{stem}.json", "w") as f:
+            json.dump(self.report(), f, indent=2)
+        if prometheus:
+            with open(f"{stem}.prom", "w") as f:
+                f.write(self.to_prometheus())
+        return f"{stem}.json"
@@ -1,5 +1,4 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Generator, List
 
 from dotenv import load_dotenv
@@ -16,50 +15,37 @@ logger = logging.getLogger(__name__)
 
 
 class WikiArtETL(BasePaintingsETL):
-    def __init__(self, batch_size=600, workers=5):
-        super().__init__(batch_size, workers)
+    name = "enrichment"
 
-        self.retriever = WikiArtRetriever()
+    def __init__(self, batch_size=600, workers=5, transform_workers=1, load_workers=1):
+        super().__init__(batch_size, workers, transform_workers, load_workers)
+
+        self.retriever = WikiArtRetriever(pool_size=workers)
         self.db = QdrantDB()
 
     def extract(self) -> Generator[List[Dict], None, None]:
         yield from self.db.scroll(batch_size=self.batch_size, limit=1)
 
     def transform(self, batch: List[Dict]) -> List[Dict]:
-        """Transform a single batch using internal threads"""
+        """Transform a single batch with concurrent requests on the retriever's pool"""
         logger.info(f"Transforming batch of {len(batch)} paintings...")
-        enriched = []
-
-        with ThreadPoolExecutor(max_workers=self.workers) as executor:
-            # Map future to original painting dict
-            future_to_painting = {
-                executor.submit(
-                    self.retriever.get_painting_details,
-                    painting["payload"]["wikiart_id"]
-                ): painting
-                for painting in batch
-                if painting["payload"].get("wikiart_id")  # Only if ID exists
-            }
 
-            for future in as_completed(future_to_painting):
-                painting = future_to_painting[future]
-                try:
-                    enriched_data = future.result()
-                    # Update the payload with enriched data
-                    painting["payload"].update(enriched_data)
-                    enriched.append(painting)
-                except Exception as e:
-                    wikiart_id = painting["payload"].get("wikiart_id")
-                    logger.error(f"Error enriching painting {wikiart_id}: {e}")
-                    # Append original painting on error
-                    enriched.append(painting)
+        # Only if ID exists
+        enriched = [painting for painting in batch if painting["payload"].get("wikiart_id")]
+        details = self.retriever.get_painting_details_many(
+            [painting["payload"]["wikiart_id"] for painting in enriched]
+        )
+        # Failed requests return {}, leaving the original payload
+        for painting, enriched_data in zip(enriched, details):
+            painting["payload"].update(enriched_data)
 
         return enriched
 
-    def load(self, batch: List[Dict]) -> None:
+    def load(self, batch: List[Dict], embeddings=None) -> None:
         """Load a single batch"""
         logger.info(f"Loading batch of {len(batch)} paintings to DB...")
-        self.db.update_payload_by_id(batch)
+        # Chunks go out back to back; the last request waits for all of them.
+        self.db.update_payload_by_id(batch, wait=False)
 
 
 if __name__ == "__main__":
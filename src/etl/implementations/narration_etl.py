@@ -0,0 +1,210 @@
+import argparse
+import logging
+import os
+import threading
+from concurrent.futures import as_completed
+from typing import Dict, Generator, List, Optional
+
+from dotenv import load_dotenv
+from langchain.chat_models import init_chat_model
+
+from config import narration_store_config
+from src.agent.artguide_agent import ArtGuide
+from src.agent.tools.base_tools import BaseTools
+from src.agent.tools.llm_tools import LLMTools
+from src.etl.base_paintings_etl import BasePaintingsETL
+from src.retrievers.wikiart_retriever import WikiArtRetriever
+from src.services.narration_store import NarrationStore
+from src.services.piper_speaker import PIPER_VOICE_MAPPER, PiperSpeaker
+from src.services.qdrant_db import QdrantDB
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class NarrationETL(BasePaintingsETL):
+    """Pregenerates the narrations of the most viewed paintings into the NarrationStore.
+
+    Extract ranks the collection's paintings by WikiArt's most-viewed listing, transform
+    writes one description per language and duration, and load synthesizes it with
+    every voice of that language in PIPER_VOICE_MAPPER. Narrations already stored are
+    skipped, so a rerun only fills in what is missing: paintings that entered the top
+    N, or everything after the description prompt changed.
+    """
+
+    name = "narration"
+    # Fields of the search result the agent merges over a generated description
+    MATCH_FIELDS = ("title", "artist", "image_url", "url")
+
+    def __init__(self, top_n=None, batch_size=10, workers=5, transform_workers=1, load_workers=1):
+        super().__init__(batch_size, workers, transform_workers, load_workers)
+
+        self.top_n = top_n or narration_store_config["top_n"]
+        self.retriever = WikiArtRetriever()
+        self.db = QdrantDB()
+        self.store = NarrationStore(narration_store_config["path"])
+        self.version = ArtGuide.narration_version()
+
+        self.llm_tools = LLMTools(
+            description_model=init_chat_model(
+                model=ArtGuide.DESCRIPTION_MODEL,
+                model_provider="mistralai",
+                api_key=os.environ["MISTRAL_API_KEY"],
+            ),
+            first_vision_model=None,
+            second_vision_model=None,
+            judge_model=None,
+        )
+        self.utils = BaseTools()
+
+        self.languages = sorted({language for language, _ in PIPER_VOICE_MAPPER})
+        self.speakers = {
+            voice: PiperSpeaker(model=model, speaker=speaker_id)
+            for voice, (model, speaker_id) in PIPER_VOICE_MAPPER.items()
+        }
+
+        self.counts = {"narrations": 0, "stored": 0, "skipped": 0, "failed": 0}
+        self._counts_lock = threading.Lock()
+
+    def run(self, resume: bool = False):
+        try:
+            report = super().run(resume)
+        finally:
+            # Also on a failed run, so the client's connection pool isn't leaked
+            self.retriever.close()
+        logger.info(f"Narration store at '{self.store.path}' updated: {self.counts}")
+        return report
+
+    def _count(self, key: str, value: int = 1) -> None:
+        with self._counts_lock:
+            self.counts[key] += value
+
+    def most_viewed(self) -> List[Dict]:
+        """The top_n most viewed paintings in the collection, most viewed first.
+
+        WikiArt's listing gives the order; a painting it lists that was never ingested
+        can't be recognized, so it gets no narration and doesn't take a place.
+        """
+        paintings, pagination_token = [], ""
+        while len(paintings) < self.top_n:
+            result = self.retriever.get_paintings_page(pagination_token)
+            wikiart_ids = [painting["id"] for painting in result.get("data", [])]
+            stored = self.db.get_paintings(wikiart_ids) if wikiart_ids else {}
+            paintings.extend(stored[i] for i in wikiart_ids if i in stored)
+            if not result.get("hasMore"):
+                break
+            pagination_token = result.get("paginationToken", "")
+        return paintings[: self.top_n]
+
+    def extract(self) -> Generator[List[Dict], None, None]:
+        """Yield the most viewed paintings in batches.
+
+        extract_cursor holds the rank of the first painting not yet yielded.
+        """
+        logger.info(f"Ranking the {self.top_n} most viewed paintings in the collection...")
+        paintings = self.most_viewed()
+        start = self.resume_cursor["rank"] if self.resume_cursor else 0
+        logger.info(f"{len(paintings)} paintings ranked, starting at rank {start}")
+
+        for rank in range(start, len(paintings), self.batch_size):
+            batch = paintings[rank : rank + self.batch_size]  # noqa
+            self.extract_cursor = {"rank": rank + len(batch)}
+            yield batch
+
+    def transform(self, batch: List[Dict]) -> List[Dict]:
+        """Describe each painting in every language and duration not fully stored yet.
+
+        Returns one job per narration to synthesize: its key, voice and painting info.
+        """
+        logger.info(f"Describing batch of {len(batch)} paintings...")
+        future_to_jobs = {}
+        for painting in batch:
+            for language in self.languages:
+                for n_words in ArtGuide.DURATION_TO_NUM_WORDS.values():
+                    keys = {
+                        speaker: self.key(painting, language, n_words, speaker)
+                        for lang, speaker in self.speakers
+                        if lang == language
+                    }
+                    missing = [speaker for speaker, key in keys.items() if key not in self.store]
+                    self._count("narrations", len(keys))
+                    self._count("skipped", len(keys) - len(missing))
+                    if not missing:
+                        continue
+                    # Voices added later narrate the text the other voices already read
+                    stored = [key for key in keys.values() if key in self.store]
+                    described = self.store.get_painting(stored[0]) if stored else None
+                    future = self.executor.submit(
+                        self.describe, painting, language, n_words, described
+                    )
+                    future_to_jobs[future] = [
+                        {"key": keys[speaker], "voice": (language, speaker)} for speaker in missing
+                    ]
+
+        jobs = []
+        for future in as_completed(future_to_jobs):
+            try:
+                described = future.result()
+            except Exception as e:
+                logger.error(f"Error describing painting: {e}")
+                self._count("failed", len(future_to_jobs[future]))
+                continue
+            jobs.extend(job | {"painting": described} for job in future_to_jobs[future])
+
+        logger.info(f"Batch described: {len(jobs)} narrations to synthesize")
+        return jobs
+
+    def describe(
+        self, painting: Dict, language: str, n_words: int, described: Optional[Dict] = None
+    ) -> Dict:
+        """Painting info as the agent's fast path would produce it, description included."""
+        if described is not None:
+            return described
+        match = {field: painting.get(field) for field in self.MATCH_FIELDS}
+        if language != "en":
+            match = self.utils.translate_painting(match, language)
+        enriched = self.llm_tools.describe_painting(
+            title=match["title"], language=language, n_words=n_words
+        )
+        return enriched | match
+
+    def load(self, batch: List[Dict], embeddings=None) -> None:
+        """Synthesize each narration and store it compressed"""
+        logger.info(f"Synthesizing batch of {len(batch)} narrations...")
+        for job in batch:
+            try:
+                samples, sample_rate = self.speakers[job["voice"]].synthesize(
+                    job["painting"]["description"]
+                )
+                self.store.put(job["key"], job["painting"], samples, sample_rate)
+            except Exception as e:
+                logger.error(f"Error synthesizing narration {job['key']}: {e}")
+                self._count("failed")
+                continue
+            self._count("stored")
+
+    def key(self, painting: Dict, language: str, n_words: int, speaker: str) -> str:
+        """The key the agent looks the narration up by, from the painting as indexed."""
+        return NarrationStore.key(
+            painting.get("title"), painting.get("artist"), language, n_words, speaker, self.version
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pregenerate narrations of the most viewed paintings."
+    )
+    parser.add_argument("--top-n", type=int, default=narration_store_config["top_n"])
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the last checkpointed batch instead of the most viewed painting",
+    )
+    parser.add_argument("--load-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    load_dotenv()
+    etl = NarrationETL(top_n=args.top_n, load_workers=args.load_workers)
+    etl.run(resume=args.resume)
@@ -1,12 +1,24 @@
+import argparse
+import hashlib
+import io
+import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import time
-from typing import Dict, Generator, List
+import os
+import threading
+from collections import deque
+from concurrent.futures import as_completed
+from datetime import datetime, timezone
+from queue import Full, Queue
+from typing import Callable, Dict, Generator, List, Optional
+
+from PIL import Image
 
 from dotenv import load_dotenv
 
+from config import etl_config
 from src.etl.base_paintings_etl import BasePaintingsETL
 from src.retrievers.wikiart_retriever import WikiArtRetriever
+from src.services.image_preprocessing import prepare_for_clip
 from src.services.qdrant_db import QdrantDB
 
 logging.basicConfig(
@@ -16,74 +28,324 @@ logger = logging.getLogger(__name__)
 
 
 class WikiArtETL(BasePaintingsETL):
-    def __init__(self, batch_size=600, workers=5):
-        super().__init__(batch_size, workers)
+    name = "wikiart"
+    HASHED_FIELDS = ("title", "artist", "image_url")
+    # Images downloaded and encoded at a time, bounding the decoded images held in memory
+    IMAGE_CHUNK_SIZE = 64
+    # Pages fetched ahead of the batches being yielded
+    PREFETCH_PAGES = 4
+
+    def __init__(
+        self,
+        batch_size=600,
+        workers=5,
+        incremental=False,
+        transform_workers=1,
+        load_workers=1,
+        embed_workers=0,
+        image_vectors=False,
+    ):
+        super().__init__(batch_size, workers, transform_workers, load_workers, embed_workers)
+
+        self.retriever = WikiArtRetriever(pool_size=workers)
+        # Image vectors need a collection with named vectors; a new one is created
+        self.image_vectors = image_vectors
+        self.db = QdrantDB(create_if_missing=image_vectors)
+        if image_vectors and not self.db.image_vectors:
+            raise ValueError(
+                f"Collection '{self.db.collection_name}' has no image vector; "
+                "point qdrant_config['collection'] at a new collection to create one"
+            )
+
+        # Incremental runs only embed and upsert paintings that are new or whose
+        # hashed fields changed since they were ingested.
+        self.incremental = incremental
+        self.counts = {"seen": 0, "new": 0, "changed": 0, "unchanged": 0}
+        self.upserted_ids = []
+        self._counts_lock = threading.Lock()
+
+    @classmethod
+    def content_hash(cls, painting: Dict) -> str:
+        """Hash of the fields the stored embedding and payload are derived from."""
+        content = "|".join(str(painting.get(field) or "") for field in cls.HASHED_FIELDS)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def run(self, resume: bool = False):
+        started_at = datetime.now(timezone.utc)
+        try:
+            return super().run(resume)
+        finally:
+            # Also on a failed crawl: the manifest records what was loaded before it
+            self.write_manifest(started_at)
+
+    def write_manifest(self, started_at: datetime) -> str:
+        """Record what this run saw and wrote, one JSON file per run."""
+        finished_at = datetime.now(timezone.utc)
+        manifest = {
+            "etl": self.name,
+            "incremental": self.incremental,
+            "resumed_from": self.resume_cursor,
+            "started_at": started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "counts": self.counts,
+            "metrics_report": self.metrics_report_path,
+            "upserted_ids": self.upserted_ids,
+        }
+        manifest_dir = os.path.join(etl_config["state_dir"], "manifests")
+        os.makedirs(manifest_dir, exist_ok=True)
+        path = os.path.join(manifest_dir, f"{self.name}-{started_at:%Y%m%d-%H%M%S}.json")
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=2)
 
-        self.retriever = WikiArtRetriever()
-        self.db = QdrantDB()
+        logger.info(f"Run manifest written to {path}: {self.counts}")
+        return path
 
     def extract(self) -> Generator[List[Dict], None, None]:
-        """Yield single batch"""
+        """Yield single batch
+
+        Pages are fetched ahead by a background thread (see _prefetch_pages), and
+        batches are drained from a deque, so no list is re-copied per batch.
+
+        Before each yield, extract_cursor is set to the page token and in-page offset
+        of the first painting not yet yielded, so a resumed run refetches that page and
+        skips what was already loaded. A token of None means the crawl is finished.
+        """
         logger.info("Starting extraction...")
-        batch = []
-        pagination_token = ""
+        # (painting, page token, offset in page), so a batch boundary maps to a position
+        pending = deque()
+        pagination_token, skip = "", 0
+        if self.resume_cursor:
+            pagination_token = self.resume_cursor["pagination_token"]
+            skip = self.resume_cursor["offset"]
+            if pagination_token is None:
+                logger.info("Checkpointed crawl already finished, nothing to extract")
+                return
 
-        while True:
-            result = self.retriever.get_paintings_page(pagination_token)
+        next_token = None
+        for page_token, result in self._prefetch_pages(pagination_token):
             paintings = result.get("data", [])
+            pending.extend(
+                (painting, page_token, offset)
+                for offset, painting in enumerate(paintings)
+                if offset >= skip
+            )
+            skip = 0
+            next_token = result.get("paginationToken", "") if result.get("hasMore") else None
+
+            while len(pending) >= self.batch_size:
+                batch = [pending.popleft()[0] for _ in range(self.batch_size)]
+                self.extract_cursor = self._cursor_at(pending, next_token)
+                logger.info(f"Extracted batch of {len(batch)} paintings")
+                yield batch
 
-            if not paintings:
-                logger.info("No paintings found")
-                break
+        if pending:
+            self.extract_cursor = {"pagination_token": None, "offset": 0}
+            logger.info(f"Extracted final batch of {len(pending)} paintings")
+            yield [painting for painting, _, _ in pending]
 
-            batch.extend(paintings)
+    def _prefetch_pages(self, pagination_token: str) -> Generator[tuple, None, None]:
+        """Yield (token, page) pairs, fetched up to PREFETCH_PAGES ahead of the consumer.
 
-            while len(batch) >= self.batch_size:
-                yield_batch = batch[: self.batch_size]
-                batch = batch[self.batch_size :]  # noqa
-                logger.info(f"Extracted batch of {len(yield_batch)} paintings")
-                yield yield_batch
+        Each page's token only arrives with the previous page, so requests can't be
+        issued in parallel; what the prefetcher hides is the round-trip, which now
+        overlaps with transforming the batches already extracted.
+        """
+        pages = Queue(maxsize=self.PREFETCH_PAGES)
+        stop = threading.Event()
 
-            if not result.get("hasMore", False):
-                break
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def fetch():
+            # The end marker is None, or the exception that stopped the fetcher, so the
+            # consumer never waits on a thread that is gone.
+            end = None
+            try:
+                token = pagination_token
+                while not stop.is_set():
+                    result = self.retriever.get_paintings_page(token)
+                    if not result.get("data"):
+                        logger.info("No paintings found")
+                        break
+                    if not put((token, result)) or not result.get("hasMore"):
+                        break
+                    # No sleep between pages: the retriever's rate limiter paces requests
+                    token = result.get("paginationToken", "")
+            except Exception as e:
+                end = e
+            finally:
+                put(end)
 
-            pagination_token = result.get("paginationToken", "")
-            time.sleep(0.5)
+        fetcher = threading.Thread(target=fetch, name="PagePrefetcher", daemon=True)
+        fetcher.start()
+        try:
+            while (item := pages.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Also reached when the consumer stops early: unblock and retire the fetcher
+            stop.set()
+            fetcher.join()
 
-        if batch:
-            logger.info(f"Extracted final batch of {len(batch)} paintings")
-            yield batch
+    @staticmethod
+    def _cursor_at(pending: deque, next_token: str) -> Dict:
+        """Position of the first pending painting, or the start of the next page."""
+        if pending:
+            _, pagination_token, offset = pending[0]
+            return {"pagination_token": pagination_token, "offset": offset}
+        return {"pagination_token": next_token, "offset": 0}
 
     def transform(self, batch: List[Dict]) -> List[Dict]:
         """Transform a single batch using internal threads"""
         logger.info(f"Transforming batch of {len(batch)} paintings...")
         enriched = []
 
-        with ThreadPoolExecutor(max_workers=self.workers) as executor:
-            future_to_painting = {
-                executor.submit(self.retriever.parse_and_enrich_painting, painting): painting
-                for painting in batch
-            }
+        future_to_painting = {
+            self.executor.submit(self.retriever.parse_and_enrich_painting, painting): painting
+            for painting in batch
+        }
 
-            for future in as_completed(future_to_painting):
-                try:
-                    enriched_painting = future.result()
-                    enriched.append(enriched_painting)
-                except Exception as e:
-                    logger.error(f"Error enriching painting: {e}")
-                    painting = future_to_painting[future]
-                    enriched.append(painting)
+        for future in as_completed(future_to_painting):
+            try:
+                enriched_painting = future.result()
+                enriched.append(enriched_painting)
+            except Exception as e:
+                logger.error(f"Error enriching painting: {e}")
+                painting = future_to_painting[future]
+                enriched.append(painting)
+
+        for painting in enriched:
+            painting["content_hash"] = self.content_hash(painting)
+        enriched = self.select_changed(enriched)
 
         logger.info(f"Batch transformed: {len(enriched)} paintings")
         return enriched
 
-    def load(self, batch: List[Dict]) -> None:
+    def select_changed(self, paintings: List[Dict]) -> List[Dict]:
+        """Keep the paintings that need (re)ingesting and tally what was skipped.
+
+        Stored hashes are fetched in one request per batch. Points ingested before
+        hashes were stored have none, so they count as changed and are rewritten once.
+        """
+        stored = {}
+        if self.incremental:
+            wikiart_ids = [p["wikiart_id"] for p in paintings if p.get("wikiart_id")]
+            stored = self.db.get_content_hashes(wikiart_ids) if wikiart_ids else {}
+
+        selected, counts = [], {"new": 0, "changed": 0, "unchanged": 0}
+        for painting in paintings:
+            wikiart_id = painting.get("wikiart_id")
+            if wikiart_id not in stored:
+                counts["new"] += 1
+            elif stored[wikiart_id] != painting["content_hash"]:
+                counts["changed"] += 1
+            else:
+                counts["unchanged"] += 1
+                continue
+            selected.append(painting)
+
+        with self._counts_lock:
+            self.counts["seen"] += len(paintings)
+            for key, value in counts.items():
+                self.counts[key] += value
+
+        if self.incremental:
+            logger.info(
+                f"{counts['new']} new, {counts['changed']} changed, "
+                f"{counts['unchanged']} unchanged paintings"
+            )
+        return selected
+
+    def embedding_loader(self) -> Callable:
+        return QdrantDB.load_model
+
+    def embed_images(self, batch: List[Dict]) -> List:
+        """Download and CLIP-encode each painting's image; None where it failed.
+
+        Downloads of a chunk run concurrently on the retriever's connection pool, are
+        decoded on the shared executor and encoded as one batch.
+        """
+        embeddings = []
+        for start in range(0, len(batch), self.IMAGE_CHUNK_SIZE):
+            chunk = batch[start : start + self.IMAGE_CHUNK_SIZE]  # noqa
+            data = self.retriever.download_images([p.get("image_url") for p in chunk])
+            images = list(self.executor.map(self._decode_image, data))
+            embeddings.extend(self.db.encode_images(images))
+            for img in images:
+                if img is not None:
+                    img.close()
+
+        missing = sum(embedding is None for embedding in embeddings)
+        if missing:
+            logger.warning(f"{missing}/{len(batch)} images unavailable, stored text vector only")
+        return embeddings
+
+    @staticmethod
+    def _decode_image(data: Optional[bytes]) -> Optional[Image.Image]:
+        if data is None:
+            return None
+        try:
+            img = prepare_for_clip(io.BytesIO(data))
+            img.load()
+            return img
+        except Exception as e:
+            logger.warning(f"Could not decode image: {e}")
+            return None
+
+    def load(self, batch: List[Dict], embeddings=None) -> None:
         """Load a single batch"""
+        if not batch:
+            logger.info("Nothing to load in this batch")
+            return
+        image_embeddings = self.embed_images(batch) if self.image_vectors else None
         logger.info(f"Loading batch of {len(batch)} paintings to DB...")
-        self.db.ingest_paintings(batch)
+        self.db.ingest_paintings(batch, embeddings, image_embeddings)
+        with self._counts_lock:
+            self.upserted_ids.extend(p.get("wikiart_id") for p in batch)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest WikiArt's most viewed paintings.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only embed and upsert paintings that are new or changed since the last run",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the last checkpointed batch instead of the first page",
+    )
+    parser.add_argument("--transform-workers", type=int, default=1)
+    parser.add_argument("--load-workers", type=int, default=1)
+    parser.add_argument(
+        "--embed-workers",
+        type=int,
+        default=0,
+        help="processes computing embeddings; 0 embeds in the load workers",
+    )
+    parser.add_argument(
+        "--image-vectors",
+        action="store_true",
+        help="also download and embed each painting's image as a named 'image' vector",
+    )
+    args = parser.parse_args()
+
     load_dotenv()
-    etl = WikiArtETL(batch_size=600, workers=10)
-    etl.run()
+    etl = WikiArtETL(
+        batch_size=600,
+        workers=10,
+        incremental=args.incremental,
+        transform_workers=args.transform_workers,
+        load_workers=args.load_workers,
+        embed_workers=args.embed_workers,
+        image_vectors=args.image_vectors,
+    )
+    etl.run(resume=args.resume)
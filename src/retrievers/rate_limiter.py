@@ -0,0 +1,65 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class AdaptiveRateLimiter:
+    """Asyncio token bucket whose refill rate adapts to how the server responds.
+
+    The rate grows additively while responses come back fast and healthy, and is
+    cut multiplicatively on a 429 or when latency climbs past `target_latency`
+    (AIMD, as in TCP congestion control). It settles just under whatever rate the
+    server tolerates, without hand-tuned sleeps.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        burst: float = 2.0,
+        target_latency: float = 2.0,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.target_latency = target_latency
+
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._throttled = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait for a token. Waiters are served in arrival order."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.target_latency:
+            self.rate = max(self.min_rate, self.rate * 0.9)
+        else:
+            # Roughly +1 request/s for every second of healthy responses.
+            self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Halve the rate; with Retry-After, also hold everyone back for that long."""
+        self._refill()
+        self._throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        if retry_after:
+            self._tokens = min(self._tokens, -retry_after * self.rate)
+
+    def stats(self) -> Dict:
+        return {"rate_per_second": round(self.rate, 2), "throttled": self._throttled}
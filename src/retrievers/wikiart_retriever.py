@@ -1,10 +1,15 @@
+import asyncio
 import logging
 import random
-import requests
+import threading
 import urllib
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
 
-from typing import Dict
+import httpx
 
+from config import wikiart_config
+from src.retrievers.rate_limiter import AdaptiveRateLimiter
 from src.retrievers.wikipedia_retriever import WikipediaRetriever
 from src.retrievers.constants import USER_AGENTS
 
@@ -15,22 +20,109 @@ logger = logging.getLogger(__name__)
 
 
 class WikiArtRetriever:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": random.choice(USER_AGENTS),
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "en-US,en;q=0.9",
-            }
+    """WikiArt API client built on one pooled httpx.AsyncClient.
+
+    Requests run on an event loop in a background thread, so the synchronous methods
+    used by the ETL threads can fan out concurrently (`*_many`) over the shared
+    connection pool. Each host gets its own AdaptiveRateLimiter, and transient
+    failures are retried with jittered exponential backoff.
+    """
+
+    BASE_URL = "https://www.wikiart.org/en/api/2"
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    BACKOFF_BASE = 0.5
+    BACKOFF_CAP = 30.0
+
+    def __init__(self, pool_size: int = None):
+        self.pool_size = pool_size or wikiart_config["pool_size"]
+        self.max_retries = wikiart_config["max_retries"]
+        self.headers = {
+            "User-Agent": random.choice(USER_AGENTS),
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "en-US,en;q=0.9",
+        }
+        self.limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="WikiArtRetrieverLoop", daemon=True
         )
+        self._thread.start()
+        self._client = self._run(self._create_client())
         self.wikipedia_retriever = WikipediaRetriever()
 
-    def get_paintings_page(self, paginationToken: str) -> Dict:
-        """Fetch a page of most-viewed paintings from the WikiArt API."""
+    async def _create_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.pool_size, max_keepalive_connections=self.pool_size
+        )
+        return httpx.AsyncClient(
+            headers=self.headers, limits=limits, timeout=30, follow_redirects=True
+        )
+
+    def _run(self, coro):
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    # ========== TRANSPORT ==========
+    def _limiter(self, url: str) -> AdaptiveRateLimiter:
+        host = urlsplit(url).hostname
+        if host not in self.limiters:
+            self.limiters[host] = AdaptiveRateLimiter(
+                rate=wikiart_config["rate"],
+                min_rate=wikiart_config["min_rate"],
+                max_rate=wikiart_config["max_rate"],
+            )
+        return self.limiters[host]
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: concurrent retries spread out instead of arriving together.
+        return random.uniform(0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2**attempt))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return None
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        """Rate-limited GET, retrying transport errors and retryable statuses."""
+        limiter = self._limiter(url)
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            start = self._loop.time()
+            try:
+                response = await self._client.get(url, **kwargs)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            retry_after = self._retry_after(response)
+            if response.status_code == 429:
+                limiter.on_throttle(retry_after)
+            elif response.status_code < 500:
+                limiter.on_success(self._loop.time() - start)
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                await asyncio.sleep(max(retry_after or 0, self._backoff(attempt)))
+                continue
+            response.raise_for_status()
+            return response
 
-        url = "https://www.wikiart.org/en/api/2/MostViewedPaintings"
+    # ========== ASYNC API ==========
+    async def aget_paintings_page(self, paginationToken: str) -> Dict:
+        """Fetch a page of most-viewed paintings from the WikiArt API.
 
+        Raises once retries are exhausted: an empty page would read as the end of the
+        listing, and a crawl checkpointed as finished is never resumed.
+        """
         if paginationToken:
             decoded_token = urllib.parse.unquote(paginationToken)
             params = {"paginationToken": decoded_token}
@@ -38,15 +130,67 @@ class WikiArtRetriever:
             params = {}
 
         try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
+            response = await self._get(f"{self.BASE_URL}/MostViewedPaintings", params=params)
             return response.json()
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.warning("WikiArt request timed out.")
-        except requests.exceptions.RequestException as e:
+            raise
+        except httpx.HTTPError as e:
             logger.warning(f"WikiArt request failed: {e.__class__.__name__}")
+            raise
+
+    async def aget_painting_details(self, painting_id: str) -> Dict:
+        """Retrieve museum and description details for a painting."""
+        try:
+            response = await self._get(f"{self.BASE_URL}/Painting/{painting_id}")
+            response_dict = response.json()
+            return {
+                "museum": response_dict.get("galleries"),
+                "description": response_dict.get("description"),
+            }
+        except httpx.TimeoutException:
+            logger.warning("WikiArt painting details request timed out.")
+        except httpx.HTTPError as e:
+            logger.warning(f"WikiArt painting details request failed: {e.__class__.__name__}")
 
-        return {"data": [], "hasMore": False}
+        return {}
+
+    async def adownload_image(self, image_url: str) -> Optional[bytes]:
+        """Download a painting image, or return None if it can't be fetched."""
+        if not image_url:
+            return None
+        try:
+            response = await self._get(image_url, headers={"Accept": "image/*"})
+            return response.content
+        except httpx.HTTPError as e:
+            logger.warning(f"WikiArt image download failed: {e.__class__.__name__}")
+        return None
+
+    # ========== SYNC API ==========
+    def get_paintings_page(self, paginationToken: str) -> Dict:
+        return self._run(self.aget_paintings_page(paginationToken))
+
+    def get_painting_details(self, painting_id: str) -> Dict:
+        return self._run(self.aget_painting_details(painting_id))
+
+    def get_painting_details_many(self, painting_ids: List[str]) -> List[Dict]:
+        """Details of several paintings, fetched concurrently as the limiter allows."""
+
+        async def _gather():
+            return await asyncio.gather(*map(self.aget_painting_details, painting_ids))
+
+        return self._run(_gather())
+
+    def download_image(self, image_url: str) -> Optional[bytes]:
+        return self._run(self.adownload_image(image_url))
+
+    def download_images(self, image_urls: List[str]) -> List[Optional[bytes]]:
+        """Several images, downloaded concurrently as the limiter allows."""
+
+        async def _gather():
+            return await asyncio.gather(*map(self.adownload_image, image_urls))
+
+        return self._run(_gather())
 
     def parse_and_enrich_painting(self, painting: Dict) -> Dict:
         """Normalize and enrich a WikiArt painting record."""
@@ -71,25 +215,6 @@ class WikiArtRetriever:
 
         return painting
 
-    def get_painting_details(self, painting_id: str) -> Dict:
-        """Retrieve museum and description details for a painting."""
-
-        url = f"https://www.wikiart.org/en/api/2/Painting/{painting_id}"
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            response_dict = response.json()
-            return {
-                "museum": response_dict.get("galleries"),
-                "description": response_dict.get("description"),
-            }
-        except requests.exceptions.Timeout:
-            logger.warning("WikiArt painting details request timed out.")
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"WikiArt painting details request failed: {e.__class__.__name__}")
-
-        return {}
-
 
 if __name__ == "__main__":
     retriever = WikiArtRetriever()
@@ -0,0 +1,66 @@
+import io
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+# Wire formats /synthesize can answer with, keyed by the short name used in code.
+# Raw PCM is little-endian int16 -- half the bytes of float32 and exactly what Piper
+# produces, so nothing is lost by narrowing to it.
+AUDIO_MEDIA_TYPES = {
+    "pcm": "application/octet-stream",
+    "wav": "audio/wav",
+    "ogg": "audio/ogg",
+}
+
+_ACCEPT_TO_FORMAT = {
+    "application/octet-stream": "pcm",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/ogg": "ogg",
+}
+
+PCM_DTYPE = "<i2"
+
+
+def negotiate_format(accept: Optional[str]) -> Optional[str]:
+    """Pick the first audio format named in an Accept header, or None for JSON."""
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";", 1)[0].strip().lower()
+        if media_type in _ACCEPT_TO_FORMAT:
+            return _ACCEPT_TO_FORMAT[media_type]
+    return None
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    """Convert float samples in [-1, 1] to little-endian int16 PCM."""
+    clipped = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (clipped * 32767).astype(PCM_DTYPE)
+
+
+def encode_audio(samples: np.ndarray, sample_rate: int, audio_format: str) -> bytes:
+    """Encode float samples into one of the AUDIO_MEDIA_TYPES formats."""
+    if audio_format == "pcm":
+        return to_pcm16(samples).tobytes()
+
+    buffer = io.BytesIO()
+    if audio_format == "wav":
+        sf.write(buffer, to_pcm16(samples), sample_rate, format="WAV", subtype="PCM_16")
+    elif audio_format == "ogg":
+        # Vorbis rather than Opus: Opus only accepts 8/12/16/24/48 kHz, and the Piper
+        # voices run at 16 and 22.05 kHz.
+        sf.write(buffer, samples, sample_rate, format="OGG", subtype="VORBIS")
+    else:
+        raise ValueError(f"Unsupported audio format: {audio_format}")
+    return buffer.getvalue()
+
+
+def decode_audio(data: bytes, audio_format: str) -> np.ndarray:
+    """Decode bytes produced by encode_audio back into float32 samples in [-1, 1].
+
+    Every format decodes to the same dtype and scale; int16 only exists on the wire.
+    """
+    if audio_format == "pcm":
+        return np.frombuffer(data, dtype=PCM_DTYPE).astype(np.float32) / 32768
+    samples, _ = sf.read(io.BytesIO(data), dtype="float32")
+    return samples
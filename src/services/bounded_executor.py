@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised instead of queueing work on an executor that is already at capacity."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"'{name}' executor is saturated, retry in {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """Thread pool with admission control for CPU-bound model calls.
+
+    At most `max_workers` tasks run and `max_pending` wait; anything beyond that is
+    rejected immediately with ExecutorSaturated rather than piling up behind work that
+    will not finish in time anyway. Separate instances keep one workload (e.g. long TTS
+    runs) from starving another (image search).
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int, retry_after: int = 1):
+        self.name = name
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_pending
+        self.retry_after = retry_after
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            logger.warning(f"Executor '{self.name}' saturated, rejecting request")
+            raise ExecutorSaturated(self.name, self.retry_after)
+
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run `fn` on the pool and await its result from the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stream(self, produce: Callable[[], Iterable]) -> AsyncGenerator:
+        """Run a blocking generator on the pool, relaying its items to the event loop.
+
+        The whole generator holds a single slot. Admission happens here, eagerly, so a
+        saturated pool is reported before any response has started streaming.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def pump():
+            try:
+                for item in produce():
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        future = self.submit(pump)
+
+        async def relay():
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            await asyncio.wrap_future(future)  # re-raise whatever stopped the producer
+
+        return relay()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
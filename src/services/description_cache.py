@@ -0,0 +1,101 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class DescriptionCache:
+    """Persistent cache of generated painting descriptions, in a single SQLite file.
+
+    Entries are addressed by a hash of everything that shapes the answer: the title,
+    language and length, plus the model and a version of the prompt, so editing the
+    prompt retires the old descriptions instead of serving them. Entries older than
+    `ttl_seconds` count as misses and are purged.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 30 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # One connection shared by the agent's threads, serialized by the lock. WAL lets
+        # other processes (e.g. several dashboard workers) read while one writes.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS descriptions ("
+                "key TEXT PRIMARY KEY, painting TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            purged = self._conn.execute(
+                "DELETE FROM descriptions WHERE created_at < ?", (time.time() - ttl_seconds,)
+            ).rowcount
+            entries = self._conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0]
+        logger.info(f"Description cache at '{path}' holds {entries} entries ({purged} expired)")
+
+    @staticmethod
+    def prompt_version(*prompts: str) -> str:
+        """Short fingerprint of the prompt text a description was generated from."""
+        return hashlib.sha256("\x1f".join(prompts).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def key(title: str, language: str, n_words: int, model: str, prompt_version: str) -> str:
+        # Titles are normalized so casing and stray whitespace don't split entries.
+        normalized_title = " ".join(title.split()).casefold()
+        material = "\x1f".join([prompt_version, model, language, str(n_words), normalized_title])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached painting info (description included), or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT painting, created_at FROM descriptions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            painting, created_at = row
+            if time.time() - created_at > self.ttl_seconds:
+                with self._conn:
+                    self._conn.execute("DELETE FROM descriptions WHERE key = ?", (key,))
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+        return json.loads(painting)
+
+    def put(self, key: str, painting: Dict) -> None:
+        """Store a generated painting info; descriptions that came back empty are not."""
+        if not painting.get("description"):
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO descriptions (key, painting, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(painting), time.time()),
+            )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            entries = self._conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else None,
+                "entries": entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
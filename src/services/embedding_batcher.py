@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from queue import Empty, Queue
+from typing import Any, Dict
+
+import numpy as np
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-image encodes into batched CLIP forward passes.
+
+    Requests are queued; a worker thread takes the first one, keeps collecting for at
+    most `max_wait_ms` or until `max_batch_size` images are waiting, encodes them all
+    in one call and hands each caller its own row. On CPU a batch of N costs far less
+    than N single passes, at the price of up to `max_wait_ms` of added latency.
+    """
+
+    def __init__(self, model, max_batch_size: int = 16, max_wait_ms: float = 10):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._queue_depths: Counter = Counter()  # depth seen when each batch started
+        self._encode_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="EmbeddingBatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image: Any) -> Future:
+        """Queue an image; the future resolves to its embedding."""
+        future: Future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def encode(self, image: Any) -> np.ndarray:
+        """Blocking counterpart of submit, a drop-in for `model.encode(image)`."""
+        return self.submit(image).result()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            batches = sum(self._batch_sizes.values())
+            items = sum(size * count for size, count in self._batch_sizes.items())
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "batches": batches,
+                "items": items,
+                "mean_batch_size": round(items / batches, 2) if batches else None,
+                "mean_encode_ms": round(1000 * self._encode_seconds / batches, 1)
+                if batches
+                else None,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "queue_depth_histogram": dict(sorted(self._queue_depths.items())),
+            }
+
+    def _collect(self) -> list:
+        """Block for the first request, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        depth = self._queue.qsize() + 1
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+
+        with self._lock:
+            self._queue_depths[depth] += 1
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            images = [image for image, _ in batch]
+            start = time.perf_counter()
+            try:
+                embeddings = self.model.encode(images, batch_size=len(images))
+            except Exception as e:
+                logger.error(f"Batched encode of {len(images)} images failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._encode_seconds += time.perf_counter() - start
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
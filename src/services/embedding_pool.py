@@ -0,0 +1,93 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Set once per worker process by _init_worker.
+_model = None
+
+
+def _init_worker(load_model: Callable, torch_threads: int) -> None:
+    global _model
+    import torch
+
+    # Without this every process would size its intra-op pool to all cores.
+    torch.set_num_threads(torch_threads)
+    _model = load_model()
+
+
+def _encode_to_shared_memory(texts: List[str], batch_size: int) -> Tuple[str, tuple, str, float]:
+    """Encode in the worker and hand the matrix back through a shared memory block.
+
+    Only the block's name, shape and dtype cross the process boundary, along with how
+    long encoding took; the parent attaches, copies it out and unlinks it.
+    """
+    started_at = time.perf_counter()
+    embeddings = _model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(embeddings.nbytes, 1))
+    np.ndarray(embeddings.shape, dtype=embeddings.dtype, buffer=shm.buf)[:] = embeddings
+    shm.close()
+    return shm.name, embeddings.shape, embeddings.dtype.str, time.perf_counter() - started_at
+
+
+def _read_shared_memory(name: str, shape: tuple, dtype: str) -> np.ndarray:
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class EmbeddingPool:
+    """Text embeddings computed in a pool of worker processes.
+
+    Each process loads the model once through `load_model`, so encoding scales with
+    cores instead of contending for the GIL with the threads that write to the DB.
+    Processes are spawned rather than forked: forking a parent that already holds
+    torch and its thread pools is unsafe.
+    """
+
+    def __init__(self, load_model: Callable, processes: int, batch_size: int = 64):
+        self.processes = processes
+        self.batch_size = batch_size
+        torch_threads = max(1, (os.cpu_count() or 1) // processes)
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(load_model, torch_threads),
+        )
+        logger.info(f"Embedding pool started: {processes} processes x {torch_threads} threads")
+
+    def submit(self, texts: List[str]) -> Future:
+        """Encode `texts` in a worker.
+
+        The future resolves to (float32 matrix, seconds the worker spent encoding).
+        """
+        result = Future()
+        worker_future = self._executor.submit(_encode_to_shared_memory, texts, self.batch_size)
+
+        def _copy_out(done: Future) -> None:
+            try:
+                name, shape, dtype, seconds = done.result()
+                result.set_result((_read_shared_memory(name, shape, dtype), seconds))
+            except Exception as e:
+                result.set_exception(e)
+
+        worker_future.add_done_callback(_copy_out)
+        return result
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
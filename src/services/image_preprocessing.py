@@ -0,0 +1,42 @@
+from typing import IO, Optional, Union
+
+from PIL import Image, ImageOps
+
+# CLIP ViT-B/32 sees a 224x224 centre crop; anything decoded beyond that resolution is
+# thrown away by its own resize.
+CLIP_INPUT_SIDE = 224
+
+
+def load_image(source: Union[str, IO[bytes]], size: Optional[int] = None) -> Image.Image:
+    """Decode an image upright and in RGB, at no more resolution than `size` needs.
+
+    For JPEGs, `Image.draft` makes libjpeg decode straight at 1/2, 1/4 or 1/8 scale --
+    the largest reduction that still leaves both sides at least `size` -- so a 12MP
+    phone photo is never materialised at full size. Phones store rotation as EXIF
+    metadata rather than rotating the pixels, so the orientation is applied here too.
+    """
+    img = Image.open(source)
+    if size and img.format == "JPEG":
+        img.draft("RGB", (size, size))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    return img
+
+
+def prepare_for_clip(source: Union[str, IO[bytes]]) -> Image.Image:
+    """Decode an image for CLIP: shortest side between CLIP_INPUT_SIDE and twice that."""
+    img = load_image(source, CLIP_INPUT_SIDE)
+    # Formats without draft support (PNG, WebP, HEIC) arrive at full size; an integer
+    # box reduction gets them near the target far more cheaply than a resample.
+    factor = min(img.size) // CLIP_INPUT_SIDE
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img
+
+
+def fit_within(source: Union[str, IO[bytes]], max_side: int) -> Image.Image:
+    """Decode an image scaled down to fit a max_side x max_side box."""
+    img = load_image(source, max_side)
+    img.thumbnail((max_side, max_side))
+    return img
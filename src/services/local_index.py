@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+from typing import Dict, List
+
+import numpy as np
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class LocalVectorIndex:
+    """Exact top-K search over an exported copy of the collection, served from memory.
+
+    The collection is a bounded WikiArt set, so brute force is cheap: every vector is
+    stored L2-normalised in one memory-mapped matrix, and a query is a single
+    matrix-vector product whose scores are the same cosine similarities Qdrant returns.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    PAYLOADS_FILE = "payloads.json"
+    PAYLOAD_FIELDS = ("title", "artist", "image_url", "url")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.vectors = np.load(os.path.join(path, self.VECTORS_FILE), mmap_mode="r")
+        with open(os.path.join(path, self.PAYLOADS_FILE)) as f:
+            table = json.load(f)
+        self.ids = table["ids"]
+        self.payloads = table["payloads"]
+        logger.info(f"Local index loaded: {self.vectors.shape[0]} vectors from '{path}'")
+
+    @classmethod
+    def export(cls, db, path: str, dtype: str = "float32", batch_size: int = 256) -> None:
+        """Write every vector and a compact payload table of a QdrantDB to `path`.
+
+        From collections with named vectors, the one QdrantDB queries is exported;
+        points without it are skipped, as Qdrant would never return them either.
+
+        float16 halves the file and its page-cache footprint, but NumPy has no BLAS path
+        for it: each query then upcasts the matrix, roughly an order of magnitude slower.
+        """
+        os.makedirs(path, exist_ok=True)
+        ids, payloads, vectors = [], [], []
+        for batch in db.scroll(batch_size=batch_size, with_vectors=True):
+            for point in batch:
+                vector = point["vector"]
+                if isinstance(vector, dict):
+                    vector = vector.get(db.query_vector_name)
+                    if vector is None:
+                        continue
+                ids.append(str(point["id"]))
+                payloads.append({k: point["payload"].get(k) for k in cls.PAYLOAD_FIELDS})
+                vectors.append(vector)
+
+        if vectors:
+            matrix = np.asarray(vectors, dtype=np.float32)
+        else:  # an empty collection still yields a loadable, empty index
+            matrix = np.zeros((0, db.EMBEDDING_DIM), dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+        np.save(os.path.join(path, cls.VECTORS_FILE), matrix.astype(dtype))
+        with open(os.path.join(path, cls.PAYLOADS_FILE), "w") as f:
+            json.dump({"ids": ids, "payloads": payloads}, f, ensure_ascii=False)
+
+        logger.info(f"Exported {len(ids)} vectors ({dtype}) to '{path}'")
+
+    def search(self, vector, top_k: int = 5) -> List[Dict]:
+        """Return the top_k matches for a query vector, shaped like QdrantDB.search."""
+        query = np.array(vector, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        if not len(self.vectors):
+            return []
+        scores = np.asarray(self.vectors @ query, dtype=np.float32)
+
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [self.payloads[i] | {"score": float(scores[i])} for i in top]
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    from config import qdrant_config
+    from src.services.qdrant_db import QdrantDB
+
+    load_dotenv()
+    # Always read from Qdrant: with the local backend configured, QdrantDB would load
+    # the very index being (re)built.
+    db = QdrantDB(search_backend="qdrant")
+    LocalVectorIndex.export(db, qdrant_config["local_index_path"])
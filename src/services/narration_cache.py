@@ -0,0 +1,123 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class NarrationCache:
+    """Two-tier cache of synthesized narrations, addressed by a hash of what produced them.
+
+    The memory tier is a small LRU of decoded samples; the disk tier keeps one 16-bit WAV
+    per narration and evicts the least recently used files once it outgrows
+    `max_disk_bytes`. Disk hits are promoted to memory.
+    """
+
+    EXTENSION = ".wav"
+
+    def __init__(self, path: str, max_memory_items: int = 128, max_disk_bytes: int = 512 << 20):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        os.makedirs(self.path, exist_ok=True)
+        self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        logger.info(f"Narration cache at '{self.path}' holds {self._disk_bytes / 1e6:.1f}MB")
+
+    @staticmethod
+    def key(text: str, language: str, speaker: str, model: str) -> str:
+        """Content address of a narration: identical inputs always map to the same audio."""
+        material = "\x1f".join([model, speaker, language, text])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Return (samples, sample_rate) for a cached narration, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key]
+
+        file_path = self._file_path(key)
+        try:
+            samples, sample_rate = sf.read(file_path, dtype="float32")
+            os.utime(file_path)  # recency for the disk tier's LRU eviction
+        except (OSError, RuntimeError):  # absent, or evicted by another thread meanwhile
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        with self._lock:
+            self._counters["disk_hits"] += 1
+            self._remember(key, samples, sample_rate)
+        return samples, sample_rate
+
+    def put(self, key: str, samples: np.ndarray, sample_rate: int) -> None:
+        """Store a narration in both tiers."""
+        file_path = self._file_path(key)
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        # Written aside and renamed into place, so a concurrent reader never sees half
+        # a file.
+        sf.write(tmp_path, samples, sample_rate, format="WAV", subtype="PCM_16")
+        replaced_bytes = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        os.replace(tmp_path, file_path)
+
+        with self._lock:
+            self._remember(key, samples, sample_rate)
+            self._disk_bytes += os.path.getsize(file_path) - replaced_bytes
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, key + self.EXTENSION)
+
+    def _remember(self, key: str, samples: np.ndarray, sample_rate: int) -> None:
+        """Insert into the memory tier. Caller holds the lock."""
+        self._memory[key] = (samples, sample_rate)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_entries(self):
+        for name in os.listdir(self.path):
+            if name.endswith(self.EXTENSION):
+                stat = os.stat(os.path.join(self.path, name))
+                yield name, stat.st_size, stat.st_mtime
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until the disk tier fits. Caller holds the lock."""
+        # Some headroom below the limit, so a full cache does not rescan on every put.
+        target = int(self.max_disk_bytes * 0.9)
+        for name, size, _ in sorted(self._disk_entries(), key=lambda entry: entry[2]):
+            if self._disk_bytes <= target:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                continue
+            self._disk_bytes -= size
+            self._counters["evictions"] += 1
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.services.audio_codec import decode_audio, encode_audio
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class NarrationStore:
+    """Pregenerated narrations of popular paintings, written offline by NarrationETL.
+
+    Each entry is the painting info with its description (JSON) and the narration's
+    audio, compressed as OGG Vorbis, both named after a content key. The JSON is
+    written last, so an entry only becomes visible once its audio is complete.
+    Unlike NarrationCache nothing is evicted: the ETL decides what the store holds.
+    """
+
+    AUDIO_FORMAT = "ogg"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(
+        title: str, artist: str, language: str, n_words: int, speaker: str, version: str
+    ) -> str:
+        """Content key of a narration: the painting as indexed (untranslated title and
+        artist), what the visitor asked for, and the version of what generated it."""
+        painting = "\x1f".join(
+            " ".join((text or "").split()).casefold() for text in (title, artist)
+        )
+        material = "\x1f".join([version, language, str(n_words), speaker, painting])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._file_path(key, "json"))
+
+    def get(self, key: str) -> Optional[Tuple[Dict, np.ndarray, int]]:
+        """Return (painting, samples, sample_rate) of a stored narration, or None."""
+        try:
+            with open(self._file_path(key, "json")) as f:
+                entry = json.load(f)
+            with open(self._file_path(key, self.AUDIO_FORMAT), "rb") as f:
+                samples = decode_audio(f.read(), self.AUDIO_FORMAT)
+        except (OSError, RuntimeError, ValueError):  # absent, or being rewritten
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        with self._lock:
+            self._counters["hits"] += 1
+        return entry["painting"], samples, entry["sr"]
+
+    def get_painting(self, key: str) -> Optional[Dict]:
+        """The painting info of a stored narration, without decoding its audio."""
+        try:
+            with open(self._file_path(key, "json")) as f:
+                return json.load(f)["painting"]
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, painting: Dict, samples: np.ndarray, sample_rate: int) -> None:
+        self._write(key, self.AUDIO_FORMAT, encode_audio(samples, sample_rate, self.AUDIO_FORMAT))
+        entry = {"painting": painting, "sr": sample_rate}
+        self._write(key, "json", json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else None,
+            }
+
+    def _file_path(self, key: str, extension: str) -> str:
+        return os.path.join(self.path, f"{key}.{extension}")
+
+    def _write(self, key: str, extension: str, data: bytes) -> None:
+        # Written aside and renamed into place, so a reader never sees half a file.
+        file_path = self._file_path(key, extension)
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
@@ -1,8 +1,10 @@
 import logging
-import subprocess
+import threading
+from typing import Dict, Generator, Tuple
 
 import numpy as np
 import soundfile as sf
+from piper import PiperVoice, SynthesisConfig
 
 from config import tts_config
 
@@ -20,6 +22,29 @@ PIPER_VOICE_MAPPER = {
     ("ca", "female"): ("ca_ES-upc_ona-medium", ""),
 }
 
+# One resident voice per ONNX model, shared by every speaker of that model: the
+# male and female voices of a multi-speaker model differ only in `speaker_id`, so
+# loading the model twice would just double its memory for nothing.
+_VOICES: Dict[str, PiperVoice] = {}
+_VOICES_LOCK = threading.Lock()
+
+
+def load_voice(model_path: str, config_path: str) -> PiperVoice:
+    """Return the resident voice for a model, loading it into ONNX Runtime once."""
+    with _VOICES_LOCK:
+        voice = _VOICES.get(model_path)
+        if voice is None:
+            logger.info(f"Loading Piper voice: {model_path}")
+            voice = PiperVoice.load(model_path, config_path=config_path)
+            _VOICES[model_path] = voice
+        return voice
+
+
+def unload_voices() -> None:
+    """Drop every resident voice, so the next PiperSpeaker pays the model load again."""
+    with _VOICES_LOCK:
+        _VOICES.clear()
+
 
 class PiperSpeaker:
     def __init__(self, model: str, speaker: str):
@@ -28,28 +53,42 @@ class PiperSpeaker:
         self.model_path = f"{tts_config['path']}/{model}.onnx"
         self.config_path = self.model_path.replace(".onnx", ".onnx.json")
 
-    def synthesize(self, text: str) -> str:
-        """Generate speech audio from text using the Piper model."""
+        # Inference runs in-process on the shared session; ONNX Runtime sessions are
+        # safe to call from several request threads at once.
+        self.voice = load_voice(self.model_path, self.config_path)
+        self.syn_config = SynthesisConfig(speaker_id=int(speaker) if speaker else None)
 
-        logger.info(f"Synthesizing audio: '{text[:50]}...'")
+    @property
+    def sample_rate(self) -> int:
+        return self.voice.config.sample_rate
 
-        cmd = ["piper", "--model", self.model_path, "--config", self.config_path, "--output-raw"]
+    def synthesize_stream(self, text: str) -> Generator[np.ndarray, None, None]:
+        """Yield the speech audio of `text` one sentence at a time, as it is generated.
 
-        if self.speaker:
-            cmd.extend(["--speaker", self.speaker])
+        Piper phonemizes and infers sentence by sentence, so the first chunk is ready
+        after one sentence of inference rather than after the whole text.
+        """
+        logger.info(f"Streaming audio: '{text[:50]}...'")
+        yield from self._infer(text)
 
-        result = subprocess.run(cmd, input=text.encode("utf-8"), capture_output=True, check=True)
+    def synthesize(self, text: str) -> Tuple[np.ndarray, int]:
+        """Generate speech audio from text using the Piper model."""
 
-        audio_array = np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
-        sample_rate = 22050
-        if self.model == PIPER_VOICE_MAPPER[("ca", "male")][0]:
-            sample_rate = 16000
+        logger.info(f"Synthesizing audio: '{text[:50]}...'")
+
+        chunks = list(self._infer(text))
+        audio_array = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        sample_rate = self.sample_rate
 
         logger.info(f"  Samples: {len(audio_array)}")
         logger.info(f"  Duration: {len(audio_array) / sample_rate:.2f}s")
 
         return audio_array, sample_rate
 
+    def _infer(self, text: str) -> Generator[np.ndarray, None, None]:
+        for chunk in self.voice.synthesize(text, syn_config=self.syn_config):
+            yield chunk.audio_float_array.astype(np.float32, copy=False)
+
 
 if __name__ == "__main__":
     model, speaker = PIPER_VOICE_MAPPER[("ca", "male")]
@@ -3,16 +3,29 @@ import hashlib
 import io
 import logging
 import os
+import time
 import uuid
-from typing import Dict, Generator, List
+from typing import Dict, Generator, List, Optional, Union
 from PIL import Image
 
+import numpy as np
 from dotenv import load_dotenv
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, PointIdsList
+from qdrant_client.models import (
+    Distance,
+    NamedVector,
+    PointStruct,
+    SearchRequest,
+    SetPayload,
+    SetPayloadOperation,
+    VectorParams,
+)
 from sentence_transformers import SentenceTransformer
 
 from config import qdrant_config
+from src.services.image_preprocessing import prepare_for_clip
+from src.services.local_index import LocalVectorIndex
+from src.services.search_cache import dhash
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
@@ -22,38 +35,104 @@ logger = logging.getLogger(__name__)
 
 class QdrantDB:
     TOP_K = 5
+    ENCODE_BATCH_SIZE = 32
+    UPDATE_CHUNK_SIZE = 100
+    MODEL_NAME = "clip-ViT-B-32"
+    EMBEDDING_DIM = 512
+    # Vector names in collections that store both embeddings of each painting
+    TEXT_VECTOR = "text"
+    IMAGE_VECTOR = "image"
 
-    def __init__(self):
+    def __init__(self, create_if_missing: bool = False, search_backend: Optional[str] = None):
         self.client = QdrantClient(
             url=os.getenv("QDRANT_HOST"), api_key=os.getenv("QDRANT_TOKEN") or None
         )
         self.collection_name = qdrant_config["collection"]
         try:
-            self.client.get_collection(self.collection_name)
+            collection = self.client.get_collection(self.collection_name)
             logger.info(f"Collection '{self.collection_name}' found")
         except Exception:
-            raise
+            if not create_if_missing:
+                raise
+            collection = self.create_collection()
+
+        # Older collections hold one unnamed text vector per painting; newer ones name
+        # their vectors, and queries go to the image vector whenever there is one.
+        vectors = collection.config.params.vectors
+        self.named_vectors = isinstance(vectors, dict)
+        self.image_vectors = self.named_vectors and self.IMAGE_VECTOR in vectors
+        self.query_vector_name = None
+        if self.named_vectors:
+            self.query_vector_name = self.IMAGE_VECTOR if self.image_vectors else self.TEXT_VECTOR
+
+        self.model = self.load_model()
+        # Optional EmbeddingBatcher: when set, single-image searches share batched
+        # forward passes with whatever else is being searched concurrently.
+        self.batcher = None
+        # Optional SearchCache: when set, near-duplicate photos reuse earlier results.
+        self.search_cache = None
+
+        # With the "local" backend, queries are answered from an exported in-memory copy
+        # of the collection instead of a round-trip to Qdrant.
+        # search_backend overrides the configured one, e.g. to export the index itself.
+        self.local_index = None
+        if (search_backend or qdrant_config.get("search_backend")) == "local":
+            self.local_index = LocalVectorIndex(qdrant_config["local_index_path"])
+
+    def create_collection(self):
+        """Create the collection with named text and image vectors, and return its info."""
+        params = VectorParams(size=self.EMBEDDING_DIM, distance=Distance.COSINE)
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config={self.TEXT_VECTOR: params, self.IMAGE_VECTOR: params},
+        )
+        logger.info(f"Collection '{self.collection_name}' created with text and image vectors")
+        return self.client.get_collection(self.collection_name)
 
-        self.model = SentenceTransformer(
-            "clip-ViT-B-32", token=os.getenv("HF_TOKEN"), model_kwargs={"use_fast": False}
+    @classmethod
+    def load_model(cls) -> SentenceTransformer:
+        """Load the CLIP model shared by text (ingestion) and image (search) embeddings."""
+        return SentenceTransformer(
+            cls.MODEL_NAME, token=os.getenv("HF_TOKEN"), model_kwargs={"use_fast": False}
         )
 
+    @staticmethod
+    def painting_text(painting: Dict) -> str:
+        """Text a painting is embedded from."""
+        return f"{painting['title']} by {painting['artist']}"
+
     def to_uuid(self, text: str) -> str:
         """Return a deterministic UUID generated from the given text."""
         return str(uuid.UUID(hashlib.md5(text.encode("utf-8")).hexdigest()))
 
-    def ingest_paintings(self, paintings: List[Dict]):
-        """Encode and store painting embeddings in Qdrant."""
-        logger.info("Generating paintings embeddings...")
-        tokens = [f"{painting['title']} by {painting['artist']}" for painting in paintings]
-        embeddings = self.model.encode(tokens, show_progress_bar=True)
+    def ingest_paintings(self, paintings: List[Dict], embeddings=None, image_embeddings=None):
+        """Encode and store painting embeddings in Qdrant.
+
+        Precomputed `embeddings`, one row per painting, skip the encode step.
+        `image_embeddings` go to the image vector of collections that have one; a
+        None entry (image unavailable) leaves that painting with its text vector only.
+        """
+        if image_embeddings is not None and not self.image_vectors:
+            raise ValueError(f"Collection '{self.collection_name}' has no image vector")
+
+        if embeddings is None:
+            logger.info("Generating paintings embeddings...")
+            tokens = [self.painting_text(painting) for painting in paintings]
+            embeddings = self.model.encode(tokens, show_progress_bar=True)
+        if image_embeddings is None:
+            image_embeddings = [None] * len(paintings)
 
         points = []
-        for painting, embedding in zip(paintings, embeddings):
+        for painting, embedding, image_embedding in zip(paintings, embeddings, image_embeddings):
+            vector = embedding.tolist()
+            if self.named_vectors:
+                vector = {self.TEXT_VECTOR: vector}
+                if image_embedding is not None:
+                    vector[self.IMAGE_VECTOR] = image_embedding.tolist()
             points.append(
                 PointStruct(
                     id=self.to_uuid(painting.get("wikiart_id")),
-                    vector=embedding.tolist(),
+                    vector=vector,
                     payload=painting,
                 )
             )
@@ -61,50 +140,78 @@ class QdrantDB:
 
         logger.info(f"Qdrant updated with {len(paintings)} embeddings")
 
-    def update_payload_by_id(self, paintings: List[Dict]):
-        """Update Qdrant points using its id."""
-        for painting in paintings:
-            self.client.set_payload(
+    def get_content_hashes(self, wikiart_ids: List[str]) -> Dict[str, str]:
+        """Return the stored content hash of each already-ingested painting.
+
+        Paintings that are not in the collection are absent from the result; ones
+        ingested before hashes were stored map to None.
+        """
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[self.to_uuid(wikiart_id) for wikiart_id in wikiart_ids],
+            with_payload=["wikiart_id", "content_hash"],
+            with_vectors=False,
+        )
+        return {p.payload.get("wikiart_id"): p.payload.get("content_hash") for p in points}
+
+    def get_paintings(self, wikiart_ids: List[str]) -> Dict[str, Dict]:
+        """Return the stored payload of each painting in the collection, by wikiart_id."""
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[self.to_uuid(wikiart_id) for wikiart_id in wikiart_ids],
+            with_payload=True,
+            with_vectors=False,
+        )
+        return {p.payload.get("wikiart_id"): p.payload for p in points}
+
+    def update_payload_by_id(
+        self, paintings: List[Dict], chunk_size: int = None, wait: bool = True
+    ) -> None:
+        """Update Qdrant points using its id.
+
+        Updates are grouped `chunk_size` at a time into `batch_update_points` requests
+        instead of one blocking `set_payload` round-trip per painting. With wait=False
+        only the final request blocks; it acts as the flush, returning once the
+        collection has applied the updates before it.
+        """
+        chunk_size = chunk_size or self.UPDATE_CHUNK_SIZE
+        operations = [
+            SetPayloadOperation(
+                set_payload=SetPayload(payload=painting["payload"], points=[painting["id"]])
+            )
+            for painting in paintings
+        ]
+
+        for start in range(0, len(operations), chunk_size):
+            is_last = start + chunk_size >= len(operations)
+            self.client.batch_update_points(
                 collection_name=self.collection_name,
-                payload=painting['payload'],
-                points=PointIdsList(points=painting['_id']),
-                wait=True
+                update_operations=operations[start : start + chunk_size],  # noqa
+                wait=wait or is_last,
             )
 
-        logger.info(f"Qdrant updated with {len(paintings)} embeddings")
+        logger.info(f"Qdrant updated with {len(paintings)} payloads")
 
-    def search(self, image_input: str) -> List[Dict]:
-        """Return the top matching paintings for a given image."""
+    def search(self, image_input: Union[str, bytes]) -> List[Dict]:
+        """Return the top matching paintings for a given image (raw bytes, base64 or path)."""
         logger.info("Searching for a painting...")
 
         try:
-            if len(image_input) > 100:  # pure base64
-                image_bytes = base64.b64decode(image_input)
-                img = Image.open(io.BytesIO(image_bytes))
-            else:
-                img = Image.open(image_input)
-
-            img_embedding = self.model.encode(img)
+            img = self._open_image(image_input)
 
-            results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=img_embedding.tolist(),
-                query_filter={},
-                limit=self.TOP_K,
-            )
+            if self.search_cache is not None:
+                start = time.perf_counter()
+                phash = dhash(img)
+                cached = self.search_cache.lookup(phash)
+                if cached is not None:
+                    logger.info("Search served from the perceptual-hash cache")
+                    return cached
 
-            matches = []
-            for hit in results:
-                matches.append(
-                    {
-                        "title": hit.payload["title"],
-                        "artist": hit.payload["artist"],
-                        "image_url": hit.payload.get("image_url"),
-                        "url": hit.payload["url"],
-                        "score": hit.score,
-                    }
-                )
+            img_embedding = self._encode_image(img)
 
+            matches = self._search_vectors([img_embedding])[0]
+            if self.search_cache is not None:
+                self.search_cache.store(phash, matches, time.perf_counter() - start)
             return matches
         except Exception as e:
             logger.error(f"Error during search: {str(e)}")
@@ -113,7 +220,102 @@ class QdrantDB:
             if 'img' in locals():
                 img.close()
 
-    def scroll(self, batch_size: int = 100, limit: int = None) -> Generator[List[Dict], None, None]:
+    def search_batch(self, image_inputs: List[Union[str, bytes]]) -> List[List[Dict]]:
+        """Return the top matching paintings for each of several images.
+
+        All images go through one batched CLIP forward pass and one Qdrant request,
+        instead of a model call and a round-trip per image.
+        """
+        logger.info(f"Searching for a batch of {len(image_inputs)} paintings...")
+
+        imgs = []
+        try:
+            imgs = [self._open_image(image_input) for image_input in image_inputs]
+            img_embeddings = self.model.encode(imgs, batch_size=self.ENCODE_BATCH_SIZE)
+
+            return self._search_vectors(img_embeddings)
+        except Exception as e:
+            logger.error(f"Error during batch search: {str(e)}")
+            raise
+        finally:
+            for img in imgs:
+                img.close()
+
+    def encode_images(self, images: List[Optional[Image.Image]]) -> List[Optional[np.ndarray]]:
+        """CLIP-encode images in batches; None entries stay None."""
+        present = [i for i, img in enumerate(images) if img is not None]
+        embeddings = [None] * len(images)
+        if present:
+            encoded = self.model.encode(
+                [images[i] for i in present], batch_size=self.ENCODE_BATCH_SIZE
+            )
+            for i, embedding in zip(present, encoded):
+                embeddings[i] = embedding
+        return embeddings
+
+    def _query_vector(self, embedding):
+        if self.query_vector_name is None:
+            return embedding.tolist()
+        return NamedVector(name=self.query_vector_name, vector=embedding.tolist())
+
+    def _search_vectors(self, embeddings) -> List[List[Dict]]:
+        """Top-K matches for each query embedding, from whichever backend is configured."""
+        if self.local_index is not None:
+            return [self.local_index.search(embedding, self.TOP_K) for embedding in embeddings]
+
+        if len(embeddings) == 1:
+            results = [
+                self.client.search(
+                    collection_name=self.collection_name,
+                    query_vector=self._query_vector(embeddings[0]),
+                    query_filter={},
+                    limit=self.TOP_K,
+                )
+            ]
+        else:
+            results = self.client.search_batch(
+                collection_name=self.collection_name,
+                requests=[
+                    SearchRequest(
+                        vector=self._query_vector(embedding), limit=self.TOP_K, with_payload=True
+                    )
+                    for embedding in embeddings
+                ],
+            )
+        return [[self._to_match(hit) for hit in hits] for hits in results]
+
+    def _encode_image(self, img: Image.Image):
+        if self.batcher is not None:
+            return self.batcher.encode(img)
+        return self.model.encode(img)
+
+    @staticmethod
+    def _open_image(image_input: Union[str, bytes]) -> Image.Image:
+        """Decode the query image directly at near-CLIP resolution.
+
+        Short strings are read as file paths, for scripts and benchmarks only: the API
+        decodes what clients send into bytes before it gets here.
+        """
+        if isinstance(image_input, bytes):  # raw upload
+            return prepare_for_clip(io.BytesIO(image_input))
+        if len(image_input) > 100:  # pure base64
+            image_bytes = base64.b64decode(image_input)
+            return prepare_for_clip(io.BytesIO(image_bytes))
+        return prepare_for_clip(image_input)
+
+    @staticmethod
+    def _to_match(hit) -> Dict:
+        return {
+            "title": hit.payload["title"],
+            "artist": hit.payload["artist"],
+            "image_url": hit.payload.get("image_url"),
+            "url": hit.payload["url"],
+            "score": hit.score,
+        }
+
+    def scroll(
+        self, batch_size: int = 100, limit: int = None, with_vectors: bool = False
+    ) -> Generator[List[Dict], None, None]:
         """Generator that retrieves all documents from QdrantDB in batches."""
         offset = None
         batches = 0
@@ -123,14 +325,17 @@ class QdrantDB:
                 limit=batch_size,
                 offset=offset,
                 with_payload=True,
-                with_vectors=False,
+                with_vectors=with_vectors,
             )
             points, offset = response[0], response[1]
             batches += 1
             if not points:
                 break
 
-            yield [dict(id=p.id, payload=p.payload) for p in points]
+            if with_vectors:
+                yield [dict(id=p.id, payload=p.payload, vector=p.vector) for p in points]
+            else:
+                yield [dict(id=p.id, payload=p.payload) for p in points]
             if offset is None:
                 break
 
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a tiny greyscale.
+
+    Robust to rescaling, recompression and small exposure changes, so two photos of the
+    same painting tend to land a few bits apart while different paintings do not.
+    """
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class SearchCache:
+    """Reuses search results for near-duplicate query photos.
+
+    Entries are keyed by perceptual hash; a lookup hits when a stored hash lies within
+    `max_distance` bits (Hamming) of the query's. Entries expire after `ttl_seconds`
+    and the least recently used go once there are more than `max_items`.
+    """
+
+    def __init__(self, max_items: int = 2048, max_distance: int = 6, ttl_seconds: float = 21600):
+        self.max_items = max_items
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[int, Tuple[List[Dict], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._distances: Counter = Counter()
+        self._miss_seconds = 0.0
+        self._timed_misses = 0
+        self._seconds_saved = 0.0
+
+    def lookup(self, phash: int) -> Optional[List[Dict]]:
+        """Return the results stored for the closest hash within range, or None."""
+        now = time.monotonic()
+        with self._lock:
+            best_key, best_distance = None, self.max_distance + 1
+            for key, (_, stored_at) in list(self._entries.items()):
+                if now - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    continue
+                distance = (key ^ phash).bit_count()
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+
+            if best_key is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self._hits += 1
+            self._distances[best_distance] += 1
+            if self._timed_misses:
+                # A hit saves what a miss costs on average.
+                self._seconds_saved += self._miss_seconds / self._timed_misses
+            results, _ = self._entries[best_key]
+            return [dict(result) for result in results]
+
+    def store(self, phash: int, results: List[Dict], elapsed_seconds: float) -> None:
+        """Store the results of a miss, along with how long it took to compute them."""
+        with self._lock:
+            self._miss_seconds += elapsed_seconds
+            self._timed_misses += 1
+            self._entries[phash] = ([dict(result) for result in results], time.monotonic())
+            self._entries.move_to_end(phash)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_distance": self.max_distance,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+                "hit_distance_histogram": dict(sorted(self._distances.items())),
+                "mean_miss_ms": round(1000 * self._miss_seconds / self._timed_misses, 1)
+                if self._timed_misses
+                else None,
+                "estimated_seconds_saved": round(self._seconds_saved, 2),
+            }